@@ -1,18 +1,59 @@
 from __future__ import annotations
 
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from typing import TYPE_CHECKING
 
-from .const import DOMAIN
+from .const import (
+    CONF_SERIES_CACHE_MB,
+    DATA_SERIES_CACHE,
+    DEFAULT_SERIES_CACHE_MB,
+    DOMAIN,
+    PRICE_SENSOR_UNIQUE_ID,
+)
+
+if TYPE_CHECKING:
+    # Home Assistant is only imported for typing so that the package (and the offline CLI
+    # in .cli) can be imported without it.
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.core import HomeAssistant
 
 PLATFORMS: list[str] = ["sensor"]
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    hass.data.setdefault(DOMAIN, {})
+    from homeassistant.core import callback
+    from homeassistant.helpers import entity_registry as er
+
+    from .cache import SeriesCache
+    from .core import get_entry_value
+    from .services import async_setup_services
+
+    # The price sensor's unique id used to be global; give it this entry's prefix in place,
+    # so the entity keeps its id and history.
+    @callback
+    def _migrate_unique_id(reg_entry: er.RegistryEntry) -> dict[str, str] | None:
+        if reg_entry.unique_id == PRICE_SENSOR_UNIQUE_ID:
+            return {"new_unique_id": f"{entry.entry_id}_{PRICE_SENSOR_UNIQUE_ID}"}
+        return None
+
+    await er.async_migrate_entries(hass, entry.entry_id, _migrate_unique_id)
+
+    data = hass.data.setdefault(DOMAIN, {})
+    cache = data.get(DATA_SERIES_CACHE)
+    if cache is None:
+        cache = data[DATA_SERIES_CACHE] = SeriesCache(DEFAULT_SERIES_CACHE_MB)
+    cache.register(entry.entry_id, int(get_entry_value(entry, CONF_SERIES_CACHE_MB, DEFAULT_SERIES_CACHE_MB)))
+
+    await async_setup_services(hass)
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     return True
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok:
+        data = hass.data[DOMAIN]
+        data.pop(entry.entry_id, None)
+        cache = data.get(DATA_SERIES_CACHE)
+        if cache is not None and cache.unregister(entry.entry_id):
+            data.pop(DATA_SERIES_CACHE)
+    return unload_ok
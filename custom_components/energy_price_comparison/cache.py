@@ -0,0 +1,118 @@
+"""Domain-wide cache of fetched meter series, shared by every config entry.
+
+Entries that point at the same total-energy entity (separate tariff offers, or several
+households on one meter) fetch the same series; the cache keeps one copy per
+(source entity, window start, resolution) and only asks the recorder for the time after
+the point it has read through. Least recently used series are evicted to stay under a memory
+cap, which is the largest one configured by the loaded entries.
+
+Like .core, this module does not import Home Assistant.
+"""
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+
+# Rough footprint of one (datetime, float) reading in a list: tuple + datetime + float + slot.
+_POINT_BYTES = 136
+
+Points = list[tuple[datetime, float]]
+SeriesKey = tuple[str, datetime, str]
+
+
+class SeriesCache:
+    """LRU of point series keyed by (source entity, window start, resolution).
+
+    fetch() is called from recorder executor jobs, possibly several at once, so the index
+    is guarded by a lock; the recorder reads themselves run outside it.
+    """
+
+    def __init__(self, default_limit_mb: int) -> None:
+        self._default_limit = default_limit_mb * 1024 * 1024
+        self._limits: dict[str, int] = {}
+        # Per key: the settled readings and the time the recorder has been read through.
+        self._series: OrderedDict[SeriesKey, tuple[Points, datetime]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats: dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @property
+    def limit_bytes(self) -> int:
+        return max(self._limits.values(), default=self._default_limit)
+
+    def register(self, entry_id: str, limit_mb: int) -> None:
+        with self._lock:
+            self._limits[entry_id] = limit_mb * 1024 * 1024
+            self._evict()
+
+    def unregister(self, entry_id: str) -> bool:
+        """Forget an entry's cap; True when no entry uses the cache any more."""
+        with self._lock:
+            self._limits.pop(entry_id, None)
+            self._evict()
+            return not self._limits
+
+    def fetch(
+        self,
+        key: SeriesKey,
+        fetcher: Callable[[datetime | None], Points | None],
+        *,
+        until: datetime,
+        settled_before: datetime,
+    ) -> Points | None:
+        """The series for `key` up to `until`, reading only what the cache does not hold.
+
+        `fetcher(since)` returns the readings from `since` on (the whole window when None)
+        up to `until`, or None when that source is unavailable. The recorder counts as read
+        through min(until, settled_before): it may still add readings newer than that.
+        """
+        with self._lock:
+            entry = self._series.get(key)
+            if entry is not None:
+                self._series.move_to_end(key)
+                self.stats["hits"] += 1
+            else:
+                self.stats["misses"] += 1
+        cached, through = entry if entry is not None else ([], None)
+
+        if through is not None and through >= until:
+            return cached[: bisect_left(cached, until, key=lambda p: p[0])]
+
+        fresh = fetcher(through)
+        if fresh is None:
+            return None
+        if cached:
+            fresh = [p for p in fresh if p[0] > cached[-1][0]]
+        points = cached + fresh
+
+        read_through = min(until, settled_before)
+        keep = points[: bisect_left(points, read_through, key=lambda p: p[0])]
+        with self._lock:
+            old = self._series.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[0]) * _POINT_BYTES
+            self._series[key] = (keep, read_through)
+            self._bytes += len(keep) * _POINT_BYTES
+            self._evict()
+
+        return points[: bisect_left(points, until, key=lambda p: p[0])]
+
+    def _evict(self) -> None:
+        limit = self.limit_bytes
+        while self._bytes > limit and self._series:
+            _key, (points, _through) = self._series.popitem(last=False)
+            self._bytes -= len(points) * _POINT_BYTES
+            self.stats["evictions"] += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "series": len(self._series),
+                "bytes": self._bytes,
+                "limit_bytes": self.limit_bytes,
+            }
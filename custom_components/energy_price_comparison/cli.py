@@ -0,0 +1,210 @@
+"""Offline tariff backtest over a Home Assistant recorder database.
+
+    python -m custom_components.energy_price_comparison.cli \
+        --db /config/home-assistant_v2.db --start 2023-01-01 --end 2026-01-01
+
+The database is opened read-only. The range is split into calendar-month shards that are
+processed on a process pool; each shard is classified with the same schedule and rate
+logic the sensors use. Rates and schedules default to the integration defaults and can be
+overridden with --options (a JSON object with the config entry's option keys, including
+rate_history for dated rate changes).
+
+The tariff logic comes from .core, so Home Assistant does not need to be installed.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any
+from zoneinfo import ZoneInfo
+
+from .const import DEFAULT_TOTAL_ENERGY_ENTITY
+from .core import MultiTariffEvaluator, build_tariff_definitions, compile_tariffs
+
+_STATES_SQL = """
+    SELECT s.last_updated_ts, s.state
+    FROM states s JOIN states_meta m ON s.metadata_id = m.metadata_id
+    WHERE m.entity_id = ? AND s.last_updated_ts >= ? AND s.last_updated_ts < ?
+      AND s.state NOT IN ('unknown', 'unavailable', '')
+    ORDER BY s.last_updated_ts
+"""
+_STATES_BASELINE_SQL = """
+    SELECT s.last_updated_ts, s.state
+    FROM states s JOIN states_meta m ON s.metadata_id = m.metadata_id
+    WHERE m.entity_id = ? AND s.last_updated_ts < ?
+      AND s.state NOT IN ('unknown', 'unavailable', '')
+    ORDER BY s.last_updated_ts DESC LIMIT 1
+"""
+# Hourly rows are stamped at the end of their hour, like _lts_hourly_points in sensor.py does;
+# the bounds passed in are shifted back one hour so the filter stays on the start_ts index.
+_STATISTICS_SQL = """
+    SELECT st.start_ts + 3600, COALESCE(st.sum, st.state)
+    FROM statistics st JOIN statistics_meta m ON st.metadata_id = m.id
+    WHERE m.statistic_id = ? AND st.start_ts >= ? AND st.start_ts < ?
+    ORDER BY st.start_ts
+"""
+_STATISTICS_BASELINE_SQL = """
+    SELECT st.start_ts + 3600, COALESCE(st.sum, st.state)
+    FROM statistics st JOIN statistics_meta m ON st.metadata_id = m.id
+    WHERE m.statistic_id = ? AND st.start_ts < ?
+    ORDER BY st.start_ts DESC LIMIT 1
+"""
+
+
+def _month_shards(start: date, end: date) -> list[tuple[date, date]]:
+    shards: list[tuple[date, date]] = []
+    cursor = start
+    while cursor < end:
+        next_month = (cursor.replace(day=28) + timedelta(days=4)).replace(day=1)
+        shards.append((cursor, min(next_month, end)))
+        cursor = next_month
+    return shards
+
+
+def _read_points(
+    conn: sqlite3.Connection,
+    source: str,
+    entity_id: str,
+    start_ts: float,
+    end_ts: float,
+) -> list[tuple[datetime, float]]:
+    if source == "statistics":
+        sql, baseline_sql = _STATISTICS_SQL, _STATISTICS_BASELINE_SQL
+        start_ts -= 3600
+        end_ts -= 3600
+    else:
+        sql, baseline_sql = _STATES_SQL, _STATES_BASELINE_SQL
+
+    # The last value before the shard is the baseline, so no delta is lost between shards.
+    rows = list(conn.execute(baseline_sql, (entity_id, start_ts)))
+    rows += conn.execute(sql, (entity_id, start_ts, end_ts))
+
+    points: list[tuple[datetime, float]] = []
+    for ts, raw in rows:
+        try:
+            v = float(raw)
+        except (TypeError, ValueError):
+            continue
+        points.append((datetime.fromtimestamp(ts, tz=timezone.utc), v))
+    return points
+
+
+def _process_shard(job: dict[str, Any]) -> dict[str, Any]:
+    tz = ZoneInfo(job["tz"])
+    entry = SimpleNamespace(options=job["options"], data={})
+    tariffs = compile_tariffs(build_tariff_definitions(entry))
+    evaluator = MultiTariffEvaluator(tariffs)
+
+    start_ts = datetime.combine(job["start"], datetime.min.time(), tzinfo=tz).timestamp()
+    end_ts = datetime.combine(job["end"], datetime.min.time(), tzinfo=tz).timestamp()
+
+    conn = sqlite3.connect(f"file:{job['db']}?mode=ro", uri=True)
+    try:
+        points = _read_points(conn, job["source"], job["entity_id"], start_ts, end_ts)
+    finally:
+        conn.close()
+
+    # One pass over the shard classifies it for every tariff; each day is priced at its own rates.
+    result = evaluator.evaluate(points, tz)
+    return {
+        "start": job["start"],
+        "rows": len(points),
+        "buckets": result.totals,
+        "costs": {t.key: t.cost(result.per_day[t.key]) for t in tariffs},
+    }
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m custom_components.energy_price_comparison.cli")
+    parser.add_argument("--db", required=True, help="path to home-assistant_v2.db")
+    parser.add_argument("--entity", default=DEFAULT_TOTAL_ENERGY_ENTITY, help="total energy entity / statistic id")
+    parser.add_argument("--source", choices=["states", "statistics"], default="statistics")
+    parser.add_argument("--start", required=True, type=date.fromisoformat, help="first day (inclusive)")
+    parser.add_argument("--end", required=True, type=date.fromisoformat, help="last day (exclusive)")
+    parser.add_argument("--tz", default="Europe/Warsaw")
+    parser.add_argument("--options", help="JSON file with config entry options (rates, ranges)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    options: dict[str, Any] = {}
+    if args.options:
+        with open(args.options, encoding="utf-8") as f:
+            options = json.load(f)
+    definitions = build_tariff_definitions(SimpleNamespace(options=options, data={}))
+    keys = [d.key for d in definitions]
+
+    jobs = [
+        {
+            "db": args.db,
+            "source": args.source,
+            "entity_id": args.entity,
+            "start": start,
+            "end": end,
+            "tz": args.tz,
+            "options": options,
+        }
+        for start, end in _month_shards(args.start, args.end)
+    ]
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        results = sorted(pool.map(_process_shard, jobs), key=lambda r: r["start"])
+    elapsed = time.perf_counter() - started
+
+    periods: dict[str, dict[str, list[float]]] = {}
+    costs: dict[str, dict[str, float]] = {}
+    for r in results:
+        for key in (r["start"].strftime("%Y-%m"), r["start"].strftime("%Y")):
+            period = periods.setdefault(key, {d.key: [0.0] * len(d.zones) for d in definitions})
+            period_costs = costs.setdefault(key, {d.key: 0.0 for d in definitions})
+            for tariff, zones_kwh in r["buckets"].items():
+                acc = period[tariff]
+                for i, kwh in enumerate(zones_kwh):
+                    acc[i] += kwh
+                period_costs[tariff] += r["costs"][tariff]
+
+    report: dict[str, Any] = {}
+    for key in sorted(periods, key=lambda k: (k[:4], len(k) == 4, k)):
+        report[key] = {
+            d.key: {
+                "zones_kwh": {zone: round(kwh, 4) for zone, kwh in zip(d.zones, periods[key][d.key])},
+                "cost_pln": round(costs[key][d.key], 2),
+            }
+            for d in definitions
+        }
+
+    rows = sum(r["rows"] for r in results)
+    throughput = {
+        "shards": len(results),
+        "rows": rows,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(rows / elapsed, 1) if elapsed > 0 else None,
+    }
+
+    if args.json:
+        json.dump({"periods": report, "throughput": throughput}, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        print("period   " + "".join(f"{t:>12}" for t in keys))
+        for key, tariff_costs in report.items():
+            print(f"{key:<9}" + "".join(f"{tariff_costs[t]['cost_pln']:>12.2f}" for t in keys))
+        print(
+            f"{rows} rows in {throughput['shards']} shards, {throughput['seconds']} s "
+            f"({throughput['rows_per_second']} rows/s)",
+            file=sys.stderr,
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
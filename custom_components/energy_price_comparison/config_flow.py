@@ -1,14 +1,17 @@
 from __future__ import annotations
 
+from types import SimpleNamespace
+
 import voluptuous as vol
 from homeassistant import config_entries
+from homeassistant.helpers.selector import TextSelector, TextSelectorConfig
 
 from .const import (
     DOMAIN,
     CONF_PRICE_ENTITY,
-    CONF_ENERGY_ENTITY,
+    CONF_TOTAL_ENERGY_ENTITY,
     DEFAULT_PRICE_ENTITY,
-    DEFAULT_ENERGY_ENTITY,
+    DEFAULT_TOTAL_ENERGY_ENTITY,
 
     CONF_G11_RATE,
     DEFAULT_G11_RATE,
@@ -36,22 +39,111 @@ from .const import (
     CONF_G12W_NIGHT_RATE,
     DEFAULT_G12W_DAY_RATE,
     DEFAULT_G12W_NIGHT_RATE,
+    CONF_G12W_DAY_RANGE_1_START,
+    CONF_G12W_DAY_RANGE_2_SUMMER_START,
+    CONF_G12W_DAY_RANGE_2_WINTER_START,
+    CONF_G12W_NIGHT_RANGE_1_SUMMER_START,
+    CONF_G12W_NIGHT_RANGE_1_WINTER_START,
+    CONF_G12W_NIGHT_RANGE_2_START,
+    DEFAULT_G12W_DAY_RANGE_1_START,
+    DEFAULT_G12W_DAY_RANGE_2_SUMMER_START,
+    DEFAULT_G12W_DAY_RANGE_2_WINTER_START,
+    DEFAULT_G12W_NIGHT_RANGE_1_SUMMER_START,
+    DEFAULT_G12W_NIGHT_RANGE_1_WINTER_START,
+    DEFAULT_G12W_NIGHT_RANGE_2_START,
 
     CONF_G12N_DAY_RATE,
     CONF_G12N_NIGHT_RATE,
     DEFAULT_G12N_DAY_RATE,
     DEFAULT_G12N_NIGHT_RATE,
+    CONF_G12N_DAY_START,
+    CONF_G12N_NIGHT_START,
+    DEFAULT_G12N_DAY_START,
+    DEFAULT_G12N_NIGHT_START,
+
+    CONF_G13_MORNING_PEAK_RATE,
+    CONF_G13_AFTERNOON_PEAK_RATE,
+    CONF_G13_OFF_PEAK_RATE,
+    DEFAULT_G13_MORNING_PEAK_RATE,
+    DEFAULT_G13_AFTERNOON_PEAK_RATE,
+    DEFAULT_G13_OFF_PEAK_RATE,
+    CONF_G13_MORNING_PEAK_START,
+    CONF_G13_MORNING_PEAK_END,
+    CONF_G13_AFTERNOON_PEAK_SUMMER_START,
+    CONF_G13_AFTERNOON_PEAK_SUMMER_END,
+    CONF_G13_AFTERNOON_PEAK_WINTER_START,
+    CONF_G13_AFTERNOON_PEAK_WINTER_END,
+    DEFAULT_G13_MORNING_PEAK_START,
+    DEFAULT_G13_MORNING_PEAK_END,
+    DEFAULT_G13_AFTERNOON_PEAK_SUMMER_START,
+    DEFAULT_G13_AFTERNOON_PEAK_SUMMER_END,
+    DEFAULT_G13_AFTERNOON_PEAK_WINTER_START,
+    DEFAULT_G13_AFTERNOON_PEAK_WINTER_END,
+
+    CONF_CURRENT_TARIFF,
+    DEFAULT_CURRENT_TARIFF,
+    TARIFFS,
+
+    CONF_SQL_HOURLY_AGGREGATION,
+    DEFAULT_SQL_HOURLY_AGGREGATION,
+
+    CONF_RATE_HISTORY,
+    DEFAULT_RATE_HISTORY,
+
+    CONF_SERIES_CACHE_MB,
+    DEFAULT_SERIES_CACHE_MB,
+    CONF_COMPACT_MODE,
+    DEFAULT_COMPACT_MODE,
+)
+from .core import build_tariff_definitions, compile_tariffs
+
+# Time ranges (HH:MM strings) of the tariffs after G12, in form order, with their defaults.
+G12W_RANGES = (
+    (CONF_G12W_DAY_RANGE_1_START, DEFAULT_G12W_DAY_RANGE_1_START),
+    (CONF_G12W_DAY_RANGE_2_SUMMER_START, DEFAULT_G12W_DAY_RANGE_2_SUMMER_START),
+    (CONF_G12W_DAY_RANGE_2_WINTER_START, DEFAULT_G12W_DAY_RANGE_2_WINTER_START),
+    (CONF_G12W_NIGHT_RANGE_1_SUMMER_START, DEFAULT_G12W_NIGHT_RANGE_1_SUMMER_START),
+    (CONF_G12W_NIGHT_RANGE_1_WINTER_START, DEFAULT_G12W_NIGHT_RANGE_1_WINTER_START),
+    (CONF_G12W_NIGHT_RANGE_2_START, DEFAULT_G12W_NIGHT_RANGE_2_START),
+)
+G12N_RANGES = (
+    (CONF_G12N_DAY_START, DEFAULT_G12N_DAY_START),
+    (CONF_G12N_NIGHT_START, DEFAULT_G12N_NIGHT_START),
+)
+G13_RANGES = (
+    (CONF_G13_MORNING_PEAK_START, DEFAULT_G13_MORNING_PEAK_START),
+    (CONF_G13_MORNING_PEAK_END, DEFAULT_G13_MORNING_PEAK_END),
+    (CONF_G13_AFTERNOON_PEAK_SUMMER_START, DEFAULT_G13_AFTERNOON_PEAK_SUMMER_START),
+    (CONF_G13_AFTERNOON_PEAK_SUMMER_END, DEFAULT_G13_AFTERNOON_PEAK_SUMMER_END),
+    (CONF_G13_AFTERNOON_PEAK_WINTER_START, DEFAULT_G13_AFTERNOON_PEAK_WINTER_START),
+    (CONF_G13_AFTERNOON_PEAK_WINTER_END, DEFAULT_G13_AFTERNOON_PEAK_WINTER_END),
 )
 
 
+def _validate_tariffs(data: dict, options: dict) -> tuple[dict[str, str], dict[str, str]]:
+    """(errors, placeholders) for the form; compiled like the sensors do, so what is saved loads."""
+    try:
+        definitions = build_tariff_definitions(SimpleNamespace(data=data, options=options))
+    except ValueError as err:
+        return {CONF_RATE_HISTORY: "invalid_rate_history"}, {"error": str(err)}
+    try:
+        compile_tariffs(definitions)
+    except ValueError as err:
+        return {"base": "invalid_time"}, {"error": str(err)}
+    return {}, {"error": ""}
+
+
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
 
     async def async_step_user(self, user_input=None):
-        await self.async_set_unique_id(DOMAIN)
-        self._abort_if_unique_id_configured()
-
-        if user_input is None:
+        # Several entries are allowed (e.g. one per tariff offer); entries on the same meter
+        # share fetched series through the domain-level cache.
+        errors: dict[str, str] = {}
+        placeholders = {"error": ""}
+        if user_input is not None:
+            errors, placeholders = _validate_tariffs(user_input, {})
+        if user_input is None or errors:
             return self.async_show_form(
                 step_id="user",
                 data_schema=vol.Schema(
@@ -61,8 +153,8 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                             default=DEFAULT_PRICE_ENTITY,
                         ): str,
                         vol.Required(
-                            CONF_ENERGY_ENTITY,
-                            default=DEFAULT_ENERGY_ENTITY,
+                            CONF_TOTAL_ENERGY_ENTITY,
+                            default=DEFAULT_TOTAL_ENERGY_ENTITY,
                         ): str,
 
                         # --- G11 ---
@@ -86,16 +178,32 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                         # --- G12w ---
                         vol.Required(CONF_G12W_DAY_RATE, default=DEFAULT_G12W_DAY_RATE): vol.Coerce(float),
                         vol.Required(CONF_G12W_NIGHT_RATE, default=DEFAULT_G12W_NIGHT_RATE): vol.Coerce(float),
+                        **{vol.Required(key, default=default): str for key, default in G12W_RANGES},
 
                         # --- G12n ---
                         vol.Required(CONF_G12N_DAY_RATE, default=DEFAULT_G12N_DAY_RATE): vol.Coerce(float),
                         vol.Required(CONF_G12N_NIGHT_RATE, default=DEFAULT_G12N_NIGHT_RATE): vol.Coerce(float),
+                        **{vol.Required(key, default=default): str for key, default in G12N_RANGES},
+
+                        # --- G13 ---
+                        vol.Required(CONF_G13_MORNING_PEAK_RATE, default=DEFAULT_G13_MORNING_PEAK_RATE): vol.Coerce(float),
+                        vol.Required(CONF_G13_AFTERNOON_PEAK_RATE, default=DEFAULT_G13_AFTERNOON_PEAK_RATE): vol.Coerce(float),
+                        vol.Required(CONF_G13_OFF_PEAK_RATE, default=DEFAULT_G13_OFF_PEAK_RATE): vol.Coerce(float),
+                        **{vol.Required(key, default=default): str for key, default in G13_RANGES},
+
+                        # --- Comparison ---
+                        vol.Required(CONF_CURRENT_TARIFF, default=DEFAULT_CURRENT_TARIFF): vol.In(TARIFFS),
                     }
                 ),
+                errors=errors,
+                description_placeholders=placeholders,
             )
 
+        # Entries are told apart by the meter they read.
+        meter = user_input[CONF_TOTAL_ENERGY_ENTITY]
+        state = self.hass.states.get(meter)
         return self.async_create_entry(
-            title="Energy Price Comparison",
+            title=f"Energy Price Comparison ({state.name if state is not None else meter})",
             data=user_input,
         )
 
@@ -116,8 +224,8 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             self._entry.data.get(CONF_PRICE_ENTITY, DEFAULT_PRICE_ENTITY),
         )
         current_energy = self._entry.options.get(
-            CONF_ENERGY_ENTITY,
-            self._entry.data.get(CONF_ENERGY_ENTITY, DEFAULT_ENERGY_ENTITY),
+            CONF_TOTAL_ENERGY_ENTITY,
+            self._entry.data.get(CONF_TOTAL_ENERGY_ENTITY, DEFAULT_TOTAL_ENERGY_ENTITY),
         )
         current_rate = self._entry.options.get(
             CONF_G11_RATE,
@@ -178,38 +286,112 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             self._entry.data.get(CONF_G12N_NIGHT_RATE, DEFAULT_G12N_NIGHT_RATE),
         )
 
-        if user_input is None:
-            return self.async_show_form(
-                step_id="init",
-                data_schema=vol.Schema(
-                    {
-                        # Existing
-                        vol.Required(CONF_PRICE_ENTITY, default=current_price): str,
-                        vol.Required(CONF_ENERGY_ENTITY, default=current_energy): str,
-                        vol.Required(CONF_G11_RATE, default=current_rate): vol.Coerce(float),
-
-                        # G12 rates
-                        vol.Required(CONF_G12_DAY_RATE, default=current_g12_day_rate): vol.Coerce(float),
-                        vol.Required(CONF_G12_NIGHT_RATE, default=current_g12_night_rate): vol.Coerce(float),
-
-                        # G12 time ranges (HH:MM strings)
-                        vol.Required(CONF_G12_DAY_RANGE_1_START, default=current_g12_day_range_1_start): str,
-                        vol.Required(CONF_G12_DAY_RANGE_2_SUMMER_START, default=current_g12_day_range_2_summer_start): str,
-                        vol.Required(CONF_G12_DAY_RANGE_2_WINTER_START, default=current_g12_day_range_2_winter_start): str,
-
-                        vol.Required(CONF_G12_NIGHT_RANGE_1_SUMMER_START, default=current_g12_night_range_1_summer_start): str,
-                        vol.Required(CONF_G12_NIGHT_RANGE_1_WINTER_START, default=current_g12_night_range_1_winter_start): str,
-                        vol.Required(CONF_G12_NIGHT_RANGE_2_START, default=current_g12_night_range_2_start): str,
-
-                        # NEW: G12w rates
-                        vol.Required(CONF_G12W_DAY_RATE, default=current_g12w_day_rate): vol.Coerce(float),
-                        vol.Required(CONF_G12W_NIGHT_RATE, default=current_g12w_night_rate): vol.Coerce(float),
-
-                        # NEW: G12n rates
-                        vol.Required(CONF_G12N_DAY_RATE, default=current_g12n_day_rate): vol.Coerce(float),
-                        vol.Required(CONF_G12N_NIGHT_RATE, default=current_g12n_night_rate): vol.Coerce(float),
-                    }
-                ),
-            )
+        # G12w / G12n / G13 time ranges
+        current_ranges = {
+            key: self._entry.options.get(key, self._entry.data.get(key, default))
+            for key, default in (*G12W_RANGES, *G12N_RANGES, *G13_RANGES)
+        }
 
-        return self.async_create_entry(title="", data=user_input)
+        current_g13_morning_peak_rate = self._entry.options.get(
+            CONF_G13_MORNING_PEAK_RATE,
+            self._entry.data.get(CONF_G13_MORNING_PEAK_RATE, DEFAULT_G13_MORNING_PEAK_RATE),
+        )
+        current_g13_afternoon_peak_rate = self._entry.options.get(
+            CONF_G13_AFTERNOON_PEAK_RATE,
+            self._entry.data.get(CONF_G13_AFTERNOON_PEAK_RATE, DEFAULT_G13_AFTERNOON_PEAK_RATE),
+        )
+        current_g13_off_peak_rate = self._entry.options.get(
+            CONF_G13_OFF_PEAK_RATE,
+            self._entry.data.get(CONF_G13_OFF_PEAK_RATE, DEFAULT_G13_OFF_PEAK_RATE),
+        )
+
+        current_tariff = self._entry.options.get(
+            CONF_CURRENT_TARIFF,
+            self._entry.data.get(CONF_CURRENT_TARIFF, DEFAULT_CURRENT_TARIFF),
+        )
+
+        current_sql_hourly = self._entry.options.get(
+            CONF_SQL_HOURLY_AGGREGATION,
+            self._entry.data.get(CONF_SQL_HOURLY_AGGREGATION, DEFAULT_SQL_HOURLY_AGGREGATION),
+        )
+
+        current_rate_history = self._entry.options.get(
+            CONF_RATE_HISTORY,
+            self._entry.data.get(CONF_RATE_HISTORY, DEFAULT_RATE_HISTORY),
+        )
+
+        current_series_cache_mb = self._entry.options.get(
+            CONF_SERIES_CACHE_MB,
+            self._entry.data.get(CONF_SERIES_CACHE_MB, DEFAULT_SERIES_CACHE_MB),
+        )
+
+        current_compact_mode = self._entry.options.get(
+            CONF_COMPACT_MODE,
+            self._entry.data.get(CONF_COMPACT_MODE, DEFAULT_COMPACT_MODE),
+        )
+
+        errors: dict[str, str] = {}
+        placeholders = {"error": ""}
+        if user_input is not None:
+            errors, placeholders = _validate_tariffs(self._entry.data, user_input)
+            if not errors:
+                return self.async_create_entry(title="", data=user_input)
+            current_rate_history = user_input.get(CONF_RATE_HISTORY, current_rate_history)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    # Existing
+                    vol.Required(CONF_PRICE_ENTITY, default=current_price): str,
+                    vol.Required(CONF_TOTAL_ENERGY_ENTITY, default=current_energy): str,
+                    vol.Required(CONF_G11_RATE, default=current_rate): vol.Coerce(float),
+
+                    # G12 rates
+                    vol.Required(CONF_G12_DAY_RATE, default=current_g12_day_rate): vol.Coerce(float),
+                    vol.Required(CONF_G12_NIGHT_RATE, default=current_g12_night_rate): vol.Coerce(float),
+
+                    # G12 time ranges (HH:MM strings)
+                    vol.Required(CONF_G12_DAY_RANGE_1_START, default=current_g12_day_range_1_start): str,
+                    vol.Required(CONF_G12_DAY_RANGE_2_SUMMER_START, default=current_g12_day_range_2_summer_start): str,
+                    vol.Required(CONF_G12_DAY_RANGE_2_WINTER_START, default=current_g12_day_range_2_winter_start): str,
+
+                    vol.Required(CONF_G12_NIGHT_RANGE_1_SUMMER_START, default=current_g12_night_range_1_summer_start): str,
+                    vol.Required(CONF_G12_NIGHT_RANGE_1_WINTER_START, default=current_g12_night_range_1_winter_start): str,
+                    vol.Required(CONF_G12_NIGHT_RANGE_2_START, default=current_g12_night_range_2_start): str,
+
+                    # NEW: G12w rates
+                    vol.Required(CONF_G12W_DAY_RATE, default=current_g12w_day_rate): vol.Coerce(float),
+                    vol.Required(CONF_G12W_NIGHT_RATE, default=current_g12w_night_rate): vol.Coerce(float),
+                    **{vol.Required(key, default=current_ranges[key]): str for key, _ in G12W_RANGES},
+
+                    # NEW: G12n rates
+                    vol.Required(CONF_G12N_DAY_RATE, default=current_g12n_day_rate): vol.Coerce(float),
+                    vol.Required(CONF_G12N_NIGHT_RATE, default=current_g12n_night_rate): vol.Coerce(float),
+                    **{vol.Required(key, default=current_ranges[key]): str for key, _ in G12N_RANGES},
+
+                    # G13 rates
+                    vol.Required(CONF_G13_MORNING_PEAK_RATE, default=current_g13_morning_peak_rate): vol.Coerce(float),
+                    vol.Required(CONF_G13_AFTERNOON_PEAK_RATE, default=current_g13_afternoon_peak_rate): vol.Coerce(float),
+                    vol.Required(CONF_G13_OFF_PEAK_RATE, default=current_g13_off_peak_rate): vol.Coerce(float),
+                    **{vol.Required(key, default=current_ranges[key]): str for key, _ in G13_RANGES},
+
+                    # Dated rate changes, one per line
+                    vol.Optional(CONF_RATE_HISTORY, default=current_rate_history): TextSelector(
+                        TextSelectorConfig(multiline=True)
+                    ),
+
+                    # Comparison
+                    vol.Required(CONF_CURRENT_TARIFF, default=current_tariff): vol.In(TARIFFS),
+
+                    # Performance
+                    vol.Required(CONF_SQL_HOURLY_AGGREGATION, default=current_sql_hourly): bool,
+                    vol.Required(CONF_SERIES_CACHE_MB, default=current_series_cache_mb): vol.All(
+                        vol.Coerce(int), vol.Range(min=0)
+                    ),
+                    vol.Required(CONF_COMPACT_MODE, default=current_compact_mode): bool,
+                }
+            ),
+            errors=errors,
+            description_placeholders=placeholders,
+        )
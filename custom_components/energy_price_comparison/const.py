@@ -68,3 +68,80 @@ CONF_G12N_DAY_START = "g12n_day_start"
 CONF_G12N_NIGHT_START = "g12n_night_start"
 DEFAULT_G12N_DAY_START = "05:00"
 DEFAULT_G12N_NIGHT_START = "01:00"
+
+# G13 (three zones): morning peak, afternoon peak, off-peak; weekends are off-peak all day.
+# Seasons follow the calendar (summer Apr 1 - Sep 30), not DST.
+CONF_G13_MORNING_PEAK_RATE = "g13_morning_peak_rate_pln_per_kwh"
+CONF_G13_AFTERNOON_PEAK_RATE = "g13_afternoon_peak_rate_pln_per_kwh"
+CONF_G13_OFF_PEAK_RATE = "g13_off_peak_rate_pln_per_kwh"
+DEFAULT_G13_MORNING_PEAK_RATE = 0.6021
+DEFAULT_G13_AFTERNOON_PEAK_RATE = 0.7794
+DEFAULT_G13_OFF_PEAK_RATE = 0.3871
+
+CONF_G13_MORNING_PEAK_START = "g13_morning_peak_start"
+CONF_G13_MORNING_PEAK_END = "g13_morning_peak_end"
+CONF_G13_AFTERNOON_PEAK_SUMMER_START = "g13_afternoon_peak_summer_start"
+CONF_G13_AFTERNOON_PEAK_SUMMER_END = "g13_afternoon_peak_summer_end"
+CONF_G13_AFTERNOON_PEAK_WINTER_START = "g13_afternoon_peak_winter_start"
+CONF_G13_AFTERNOON_PEAK_WINTER_END = "g13_afternoon_peak_winter_end"
+
+DEFAULT_G13_MORNING_PEAK_START = "07:00"
+DEFAULT_G13_MORNING_PEAK_END = "13:00"
+DEFAULT_G13_AFTERNOON_PEAK_SUMMER_START = "19:00"
+DEFAULT_G13_AFTERNOON_PEAK_SUMMER_END = "22:00"
+DEFAULT_G13_AFTERNOON_PEAK_WINTER_START = "16:00"
+DEFAULT_G13_AFTERNOON_PEAK_WINTER_END = "21:00"
+
+# Cost projections: number of recent same-weekday days averaged per weekday profile
+PROJECTION_PROFILE_WEEKS = 4
+
+# Rate history: "YYYY-MM-DD TARIFF zone=rate ..." per line (or ";"-separated); each line
+# applies from its date, the configured rates apply before a tariff's first change
+CONF_RATE_HISTORY = "rate_history"
+DEFAULT_RATE_HISTORY = ""
+
+# Tariff comparison: the tariff the household is billed on today
+CONF_CURRENT_TARIFF = "current_tariff"
+DEFAULT_CURRENT_TARIFF = "G11"
+TARIFFS = ["G11", "G12", "G12w", "G12n", "G13"]
+
+# Scheduling: refreshes fire at tariff/period boundaries, otherwise after this idle gap
+IDLE_REFRESH_INTERVAL_MINUTES = 30
+# Windows about to roll over are refreshed this long before the boundary, so the handover
+# at the boundary only has to catch up on the last few minutes
+ROLLOVER_PREWARM_SECONDS = 300
+
+# Change detection: a source reading younger than this may not be in the recorder yet
+SOURCE_SETTLE_SECONDS = 30
+
+# Gap filling: a span this long without a raw reading (purged history, an outage) is read
+# from the hourly long-term statistics instead
+HISTORY_GAP_HOURS = 2
+
+# Export service
+SERVICE_EXPORT_HOURLY = "export_hourly_breakdown"
+EXPORT_CHUNK_DAYS = 31
+
+# Load profile services (hour-of-week matrix per period window)
+SERVICE_LOAD_PROFILE = "get_load_profile"
+SERVICE_SHIFT_SAVINGS = "shift_savings"
+SERVICE_RANGE_COST = "get_range_cost"
+PERIODS = ["today", "week", "month", "year", "last_year"]
+
+# Optional: bucket month/year history per hour inside the database
+CONF_SQL_HOURLY_AGGREGATION = "sql_hourly_aggregation"
+DEFAULT_SQL_HOURLY_AGGREGATION = False
+
+# Optional: one summary entity per period instead of the per-tariff sensors
+CONF_COMPACT_MODE = "compact_mode"
+DEFAULT_COMPACT_MODE = False
+
+# Series cache shared by all entries in hass.data[DOMAIN]; the largest cap set by a loaded
+# entry applies
+DATA_SERIES_CACHE = "series_cache"
+CONF_SERIES_CACHE_MB = "series_cache_mb"
+DEFAULT_SERIES_CACHE_MB = 32
+
+# Unique id suffix of the price sensor; it was this fixed id (no entry prefix) while only one
+# entry was allowed
+PRICE_SENSOR_UNIQUE_ID = "current_rce_price_pln_kwh"
@@ -0,0 +1,885 @@
+"""Tariff engine: schedules, zone classification, aggregation and pricing.
+
+Pure Python with no Home Assistant imports, so the sensors, the export service and the
+offline CLI share one implementation and it imports in milliseconds.
+"""
+from __future__ import annotations
+
+import heapq
+import re
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any
+
+from .const import (
+    CONF_G11_RATE,
+    CONF_G12N_DAY_RATE,
+    CONF_G12N_DAY_START,
+    CONF_G12N_NIGHT_RATE,
+    CONF_G12N_NIGHT_START,
+    CONF_G12W_DAY_RANGE_1_START,
+    CONF_G12W_DAY_RANGE_2_SUMMER_START,
+    CONF_G12W_DAY_RANGE_2_WINTER_START,
+    CONF_G12W_DAY_RATE,
+    CONF_G12W_NIGHT_RANGE_1_SUMMER_START,
+    CONF_G12W_NIGHT_RANGE_1_WINTER_START,
+    CONF_G12W_NIGHT_RANGE_2_START,
+    CONF_G12W_NIGHT_RATE,
+    CONF_G12_DAY_RANGE_1_START,
+    CONF_G12_DAY_RANGE_2_SUMMER_START,
+    CONF_G12_DAY_RANGE_2_WINTER_START,
+    CONF_G12_DAY_RATE,
+    CONF_G12_NIGHT_RANGE_1_SUMMER_START,
+    CONF_G12_NIGHT_RANGE_1_WINTER_START,
+    CONF_G12_NIGHT_RANGE_2_START,
+    CONF_G12_NIGHT_RATE,
+    CONF_G13_AFTERNOON_PEAK_RATE,
+    CONF_G13_AFTERNOON_PEAK_SUMMER_END,
+    CONF_G13_AFTERNOON_PEAK_SUMMER_START,
+    CONF_G13_AFTERNOON_PEAK_WINTER_END,
+    CONF_G13_AFTERNOON_PEAK_WINTER_START,
+    CONF_G13_MORNING_PEAK_END,
+    CONF_G13_MORNING_PEAK_RATE,
+    CONF_G13_MORNING_PEAK_START,
+    CONF_G13_OFF_PEAK_RATE,
+    CONF_RATE_HISTORY,
+    DEFAULT_G11_RATE,
+    DEFAULT_G12N_DAY_RATE,
+    DEFAULT_G12N_DAY_START,
+    DEFAULT_G12N_NIGHT_RATE,
+    DEFAULT_G12N_NIGHT_START,
+    DEFAULT_G12W_DAY_RANGE_1_START,
+    DEFAULT_G12W_DAY_RANGE_2_SUMMER_START,
+    DEFAULT_G12W_DAY_RANGE_2_WINTER_START,
+    DEFAULT_G12W_DAY_RATE,
+    DEFAULT_G12W_NIGHT_RANGE_1_SUMMER_START,
+    DEFAULT_G12W_NIGHT_RANGE_1_WINTER_START,
+    DEFAULT_G12W_NIGHT_RANGE_2_START,
+    DEFAULT_G12W_NIGHT_RATE,
+    DEFAULT_G12_DAY_RANGE_1_START,
+    DEFAULT_G12_DAY_RANGE_2_SUMMER_START,
+    DEFAULT_G12_DAY_RANGE_2_WINTER_START,
+    DEFAULT_G12_DAY_RATE,
+    DEFAULT_G12_NIGHT_RANGE_1_SUMMER_START,
+    DEFAULT_G12_NIGHT_RANGE_1_WINTER_START,
+    DEFAULT_G12_NIGHT_RANGE_2_START,
+    DEFAULT_G12_NIGHT_RATE,
+    DEFAULT_G13_AFTERNOON_PEAK_RATE,
+    DEFAULT_G13_AFTERNOON_PEAK_SUMMER_END,
+    DEFAULT_G13_AFTERNOON_PEAK_SUMMER_START,
+    DEFAULT_G13_AFTERNOON_PEAK_WINTER_END,
+    DEFAULT_G13_AFTERNOON_PEAK_WINTER_START,
+    DEFAULT_G13_MORNING_PEAK_END,
+    DEFAULT_G13_MORNING_PEAK_RATE,
+    DEFAULT_G13_MORNING_PEAK_START,
+    DEFAULT_G13_OFF_PEAK_RATE,
+    DEFAULT_RATE_HISTORY,
+)
+
+# Same literals as homeassistant.const.STATE_UNKNOWN / STATE_UNAVAILABLE.
+STATE_UNKNOWN = "unknown"
+STATE_UNAVAILABLE = "unavailable"
+
+
+def as_float(state: str | None) -> float | None:
+    if state in (None, STATE_UNKNOWN, STATE_UNAVAILABLE):
+        return None
+    try:
+        return float(state)
+    except (TypeError, ValueError):
+        return None
+
+
+def statistics_row(row: dict[str, Any]) -> tuple[datetime, float] | None:
+    """(hour start in UTC, sum or state) of one hourly statistics row, or None if unusable.
+
+    Recent recorders return `start` as an epoch timestamp, older ones as a datetime.
+    """
+    start = row.get("start")
+    if isinstance(start, (int, float)):
+        start = datetime.fromtimestamp(start, tz=timezone.utc)
+    if not isinstance(start, datetime):
+        return None
+    v = row.get("sum")
+    if v is None:
+        v = row.get("state")
+    try:
+        return start.astimezone(timezone.utc), float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def fmt_rate(rate: float) -> float:
+    return round(float(rate), 4)
+
+
+def get_entry_value(entry: Any, key: str, default: Any) -> Any:
+    """Read from entry.options -> entry.data -> default."""
+    if entry.options and key in entry.options:
+        return entry.options[key]
+    if entry.data and key in entry.data:
+        return entry.data[key]
+    return default
+
+
+def is_summer(local_dt: datetime) -> bool:
+    dst = local_dt.dst()
+    return bool(dst and dst != timedelta(0))
+
+
+def tariff_rates(entry: Any) -> dict[str, tuple[float, ...]]:
+    """Rates per tariff in zone order: (day, night) for G12*, (morning, afternoon, off-peak) for G13.
+
+    G11 repeats its single rate.
+    """
+    g11_rate = float(get_entry_value(entry, CONF_G11_RATE, DEFAULT_G11_RATE))
+    g12_day_rate = float(get_entry_value(entry, CONF_G12_DAY_RATE, DEFAULT_G12_DAY_RATE))
+    g12_night_rate = float(get_entry_value(entry, CONF_G12_NIGHT_RATE, DEFAULT_G12_NIGHT_RATE))
+    g12w_day_rate = float(get_entry_value(entry, CONF_G12W_DAY_RATE, DEFAULT_G12W_DAY_RATE))
+    g12w_night_rate = float(get_entry_value(entry, CONF_G12W_NIGHT_RATE, DEFAULT_G12W_NIGHT_RATE))
+    g12n_day_rate = float(get_entry_value(entry, CONF_G12N_DAY_RATE, DEFAULT_G12N_DAY_RATE))
+    g12n_night_rate = float(get_entry_value(entry, CONF_G12N_NIGHT_RATE, DEFAULT_G12N_NIGHT_RATE))
+    g13_rates = (
+        float(get_entry_value(entry, CONF_G13_MORNING_PEAK_RATE, DEFAULT_G13_MORNING_PEAK_RATE)),
+        float(get_entry_value(entry, CONF_G13_AFTERNOON_PEAK_RATE, DEFAULT_G13_AFTERNOON_PEAK_RATE)),
+        float(get_entry_value(entry, CONF_G13_OFF_PEAK_RATE, DEFAULT_G13_OFF_PEAK_RATE)),
+    )
+
+    return {
+        "G11": (g11_rate, g11_rate),
+        "G12": (g12_day_rate, g12_night_rate),
+        "G12w": (g12w_day_rate, g12w_night_rate),
+        "G12n": (g12n_day_rate, g12n_night_rate),
+        "G13": g13_rates,
+    }
+
+
+def schedule_cfgs(entry: Any) -> tuple[dict[str, str], dict[str, str], dict[str, str], dict[str, str]]:
+    g12_cfg = {
+        "day_range_1_start": get_entry_value(entry, CONF_G12_DAY_RANGE_1_START, DEFAULT_G12_DAY_RANGE_1_START),
+        "day_range_2_summer_start": get_entry_value(entry, CONF_G12_DAY_RANGE_2_SUMMER_START, DEFAULT_G12_DAY_RANGE_2_SUMMER_START),
+        "day_range_2_winter_start": get_entry_value(entry, CONF_G12_DAY_RANGE_2_WINTER_START, DEFAULT_G12_DAY_RANGE_2_WINTER_START),
+        "night_range_1_summer_start": get_entry_value(entry, CONF_G12_NIGHT_RANGE_1_SUMMER_START, DEFAULT_G12_NIGHT_RANGE_1_SUMMER_START),
+        "night_range_1_winter_start": get_entry_value(entry, CONF_G12_NIGHT_RANGE_1_WINTER_START, DEFAULT_G12_NIGHT_RANGE_1_WINTER_START),
+        "night_range_2_start": get_entry_value(entry, CONF_G12_NIGHT_RANGE_2_START, DEFAULT_G12_NIGHT_RANGE_2_START),
+    }
+    g12w_cfg = {
+        "day_range_1_start": get_entry_value(entry, CONF_G12W_DAY_RANGE_1_START, DEFAULT_G12W_DAY_RANGE_1_START),
+        "day_range_2_summer_start": get_entry_value(entry, CONF_G12W_DAY_RANGE_2_SUMMER_START, DEFAULT_G12W_DAY_RANGE_2_SUMMER_START),
+        "day_range_2_winter_start": get_entry_value(entry, CONF_G12W_DAY_RANGE_2_WINTER_START, DEFAULT_G12W_DAY_RANGE_2_WINTER_START),
+        "night_range_1_summer_start": get_entry_value(entry, CONF_G12W_NIGHT_RANGE_1_SUMMER_START, DEFAULT_G12W_NIGHT_RANGE_1_SUMMER_START),
+        "night_range_1_winter_start": get_entry_value(entry, CONF_G12W_NIGHT_RANGE_1_WINTER_START, DEFAULT_G12W_NIGHT_RANGE_1_WINTER_START),
+        "night_range_2_start": get_entry_value(entry, CONF_G12W_NIGHT_RANGE_2_START, DEFAULT_G12W_NIGHT_RANGE_2_START),
+        "weekend_rule": "sat_sun_always_night",
+    }
+    g12n_cfg = {
+        "day_start": get_entry_value(entry, CONF_G12N_DAY_START, DEFAULT_G12N_DAY_START),
+        "night_start": get_entry_value(entry, CONF_G12N_NIGHT_START, DEFAULT_G12N_NIGHT_START),
+        "sunday_rule": "always_night",
+    }
+    g13_cfg = {
+        "morning_peak_start": get_entry_value(entry, CONF_G13_MORNING_PEAK_START, DEFAULT_G13_MORNING_PEAK_START),
+        "morning_peak_end": get_entry_value(entry, CONF_G13_MORNING_PEAK_END, DEFAULT_G13_MORNING_PEAK_END),
+        "afternoon_peak_summer_start": get_entry_value(entry, CONF_G13_AFTERNOON_PEAK_SUMMER_START, DEFAULT_G13_AFTERNOON_PEAK_SUMMER_START),
+        "afternoon_peak_summer_end": get_entry_value(entry, CONF_G13_AFTERNOON_PEAK_SUMMER_END, DEFAULT_G13_AFTERNOON_PEAK_SUMMER_END),
+        "afternoon_peak_winter_start": get_entry_value(entry, CONF_G13_AFTERNOON_PEAK_WINTER_START, DEFAULT_G13_AFTERNOON_PEAK_WINTER_START),
+        "afternoon_peak_winter_end": get_entry_value(entry, CONF_G13_AFTERNOON_PEAK_WINTER_END, DEFAULT_G13_AFTERNOON_PEAK_WINTER_END),
+        "weekend_rule": "sat_sun_always_off_peak",
+        "summer": "04-01..09-30",
+    }
+    return g12_cfg, g12w_cfg, g12n_cfg, g13_cfg
+
+
+_HM = re.compile(r"(\d{1,2}):(\d{2})")
+
+
+def _hm_to_minute(hm: str) -> int:
+    match = _HM.fullmatch(str(hm).strip())
+    minute = int(match[1]) * 60 + int(match[2]) if match else -1
+    if not match or int(match[2]) >= 60 or minute > 24 * 60:
+        raise ValueError(f"Invalid time {hm!r}; expected HH:MM between 00:00 and 24:00")
+    return minute
+
+
+@dataclass(frozen=True)
+class ZoneWindow:
+    """[start, end) in local HH:MM ("24:00" allowed as end) assigned to `zone`."""
+
+    start: str
+    end: str
+    zone: int
+
+    @property
+    def start_minute(self) -> int:
+        return _hm_to_minute(self.start)
+
+    @property
+    def end_minute(self) -> int:
+        return _hm_to_minute(self.end)
+
+
+@dataclass(frozen=True)
+class DayRule:
+    """Zone layout for the days it matches; a tariff's first matching rule wins."""
+
+    windows: tuple[ZoneWindow, ...] = ()
+    default_zone: int = 0
+    weekdays: frozenset[int] = frozenset(range(7))  # Monday = 0
+    season: str | None = None  # "summer" / "winter" / None for both
+    holiday: bool | None = None  # True: holidays only, False: non-holidays only, None: any
+
+
+@dataclass(frozen=True)
+class TariffDefinition:
+    key: str
+    zones: tuple[str, ...]
+    rates: tuple[float, ...]
+    rules: tuple[DayRule, ...]
+    # None: summer follows DST; otherwise inclusive ((month, day), (month, day)) summer range.
+    summer_range: tuple[tuple[int, int], tuple[int, int]] | None = None
+    holidays: frozenset[date] = frozenset()
+    # (effective_from, rates) in date order; `rates` apply before the first change.
+    rate_changes: tuple[tuple[date, tuple[float, ...]], ...] = ()
+    # Shown on the cost sensors as-is (time_ranges / season_rule attributes).
+    time_ranges: dict[str, str] = field(default_factory=dict, compare=False)
+    season_rule: str = ""
+
+
+class CompiledTariff:
+    """A definition expanded into 1440-minute zone tables per (summer, weekday, holiday)."""
+
+    def __init__(self, definition: TariffDefinition) -> None:
+        self.definition = definition
+        self.key = definition.key
+        self.zones = definition.zones
+        self.rates = definition.rates
+        self._change_dates = [d for d, _ in definition.rate_changes]
+        self._change_rates = [r for _, r in definition.rate_changes]
+        self._tables: dict[tuple[bool, int, bool], bytes] = {}
+        for summer in (False, True):
+            for weekday in range(7):
+                for holiday in (False, True):
+                    self._tables[(summer, weekday, holiday)] = self._build_table(summer, weekday, holiday)
+
+    def _build_table(self, summer: bool, weekday: int, holiday: bool) -> bytes:
+        season = "summer" if summer else "winter"
+        for rule in self.definition.rules:
+            if weekday not in rule.weekdays:
+                continue
+            if rule.season is not None and rule.season != season:
+                continue
+            if rule.holiday is not None and rule.holiday != holiday:
+                continue
+            table = bytearray([rule.default_zone]) * 1440
+            # Earlier windows win on overlap, so paint them last.
+            for w in reversed(rule.windows):
+                for minute in range(w.start_minute, min(w.end_minute, 1440)):
+                    table[minute] = w.zone
+            return bytes(table)
+        return bytes(1440)
+
+    def _summer(self, d: date, dst: bool) -> bool:
+        rng = self.definition.summer_range
+        if rng is None:
+            return dst
+        md = (d.month, d.day)
+        start, end = rng
+        if start <= end:
+            return start <= md <= end
+        return md >= start or md <= end
+
+    def is_summer(self, local_dt: datetime) -> bool:
+        return self._summer(local_dt.date(), is_summer(local_dt))
+
+    def table_for(self, local_dt: datetime) -> bytes:
+        holiday = local_dt.date() in self.definition.holidays
+        return self._tables[(self.is_summer(local_dt), local_dt.weekday(), holiday)]
+
+    def zone_at(self, local_dt: datetime) -> int:
+        return self.table_for(local_dt)[local_dt.hour * 60 + local_dt.minute]
+
+    def rates_on(self, d: date) -> tuple[float, ...]:
+        i = bisect_right(self._change_dates, d)
+        return self._change_rates[i - 1] if i else self.rates
+
+    def rate_changes_between(self, start: date, end: date) -> int:
+        """Number of rate changes taking effect after `start`, up to and including `end`."""
+        return bisect_right(self._change_dates, end) - bisect_right(self._change_dates, start)
+
+    def cost(self, per_day: dict[date, tuple[float, ...]]) -> float:
+        """Price per-day zone kWh at the rates in effect on each day, in one sorted sweep."""
+        dates = self._change_dates
+        days = sorted(per_day)
+        if not days:
+            return 0.0
+        i = bisect_right(dates, days[0])
+        rates = self._change_rates[i - 1] if i else self.rates
+        total = 0.0
+        for d in days:
+            while i < len(dates) and dates[i] <= d:
+                rates = self._change_rates[i]
+                i += 1
+            total += zone_cost(per_day[d], rates)
+        return total
+
+    def zone_for(self, d: date, minute: int, dst: bool) -> int:
+        """Zone at `minute` of local day `d`, given whether DST is in effect then."""
+        return self._tables[(self._summer(d, dst), d.weekday(), d in self.definition.holidays)][minute]
+
+
+def parse_rate_history(text: str | None) -> list[tuple[date, str, dict[str, float]]]:
+    """Parse "YYYY-MM-DD TARIFF zone=rate [zone=rate ...]" lines; "#" starts a comment."""
+    changes: list[tuple[date, str, dict[str, float]]] = []
+    for n, raw in enumerate(re.split(r"[;\n]", text or ""), 1):
+        line = raw.split("#", 1)[0].strip()
+        if not line:
+            continue
+        parts = line.split()
+        if len(parts) < 3:
+            raise ValueError(f"entry {n}: expected 'YYYY-MM-DD TARIFF zone=rate', got {line!r}")
+        try:
+            effective = date.fromisoformat(parts[0])
+        except ValueError:
+            raise ValueError(f"entry {n}: invalid date {parts[0]!r}") from None
+        rates: dict[str, float] = {}
+        for item in parts[2:]:
+            zone, sep, value = item.partition("=")
+            try:
+                if not sep:
+                    raise ValueError
+                rates[zone] = float(value)
+            except ValueError:
+                raise ValueError(f"entry {n}: expected zone=rate, got {item!r}") from None
+        changes.append((effective, parts[1], rates))
+    return changes
+
+
+def _with_rate_history(
+    definitions: list[TariffDefinition],
+    history: list[tuple[date, str, dict[str, float]]],
+) -> list[TariffDefinition]:
+    by_key = {d.key: d for d in definitions}
+    for _, tariff, _ in history:
+        if tariff not in by_key:
+            raise ValueError(f"unknown tariff {tariff!r}; expected one of {', '.join(by_key)}")
+
+    out: list[TariffDefinition] = []
+    for d in definitions:
+        current = list(d.rates)
+        changes: list[tuple[date, tuple[float, ...]]] = []
+        # Zones a change does not mention keep their previous rate.
+        for effective, _, rates in sorted((c for c in history if c[1] == d.key), key=lambda c: c[0]):
+            for zone, rate in rates.items():
+                if zone not in d.zones:
+                    raise ValueError(f"{d.key} has no zone {zone!r}; zones are {', '.join(d.zones)}")
+                current[d.zones.index(zone)] = rate
+            if changes and changes[-1][0] == effective:
+                changes[-1] = (effective, tuple(current))
+            else:
+                changes.append((effective, tuple(current)))
+        out.append(replace(d, rate_changes=tuple(changes)) if changes else d)
+    return out
+
+
+def build_tariff_definitions(entry: Any) -> list[TariffDefinition]:
+    """The built-in tariffs, declared from the entry's rates, ranges and rate history.
+
+    Raises ValueError if the rate history does not parse or names unknown tariffs/zones.
+    """
+    rates = tariff_rates(entry)
+    g12_cfg, g12w_cfg, g12n_cfg, g13_cfg = schedule_cfgs(entry)
+
+    def _two_range_rules(cfg: dict[str, str]) -> tuple[DayRule, ...]:
+        # Day zone (0) in [day1, night1) and [day2, night2); night zone (1) otherwise.
+        return tuple(
+            DayRule(
+                season=season,
+                windows=(
+                    ZoneWindow(cfg["day_range_1_start"], cfg[f"night_range_1_{season}_start"], 0),
+                    ZoneWindow(cfg[f"day_range_2_{season}_start"], cfg["night_range_2_start"], 0),
+                ),
+                default_zone=1,
+            )
+            for season in ("summer", "winter")
+        )
+
+    weekend = frozenset({5, 6})
+    sunday = frozenset({6})
+    definitions = [
+        TariffDefinition(
+            key="G11",
+            zones=("all",),
+            rates=(rates["G11"][0],),
+            rules=(DayRule(),),
+        ),
+        TariffDefinition(
+            key="G12",
+            zones=("day", "night"),
+            rates=rates["G12"],
+            rules=_two_range_rules(g12_cfg),
+            time_ranges=g12_cfg,
+            season_rule="summer if DST else winter",
+        ),
+        TariffDefinition(
+            key="G12w",
+            zones=("day", "night"),
+            rates=rates["G12w"],
+            rules=(DayRule(weekdays=weekend, default_zone=1),) + _two_range_rules(g12w_cfg),
+            time_ranges=g12w_cfg,
+            season_rule="summer if DST else winter",
+        ),
+        TariffDefinition(
+            key="G12n",
+            zones=("day", "night"),
+            rates=rates["G12n"],
+            rules=(
+                DayRule(weekdays=sunday, default_zone=1),
+                DayRule(
+                    windows=(
+                        ZoneWindow(g12n_cfg["day_start"], "24:00", 0),
+                        ZoneWindow("00:00", g12n_cfg["night_start"], 0),
+                    ),
+                    default_zone=1,
+                ),
+            ),
+            time_ranges=g12n_cfg,
+            season_rule="fixed (weekday rules; no DST)",
+        ),
+        TariffDefinition(
+            key="G13",
+            zones=("morning_peak", "afternoon_peak", "off_peak"),
+            rates=rates["G13"],
+            rules=(DayRule(weekdays=weekend, default_zone=2),)
+            + tuple(
+                DayRule(
+                    season=season,
+                    windows=(
+                        ZoneWindow(g13_cfg["morning_peak_start"], g13_cfg["morning_peak_end"], 0),
+                        ZoneWindow(
+                            g13_cfg[f"afternoon_peak_{season}_start"],
+                            g13_cfg[f"afternoon_peak_{season}_end"],
+                            1,
+                        ),
+                    ),
+                    default_zone=2,
+                )
+                for season in ("summer", "winter")
+            ),
+            summer_range=((4, 1), (9, 30)),
+            time_ranges=g13_cfg,
+            season_rule="summer Apr 1 - Sep 30, else winter",
+        ),
+    ]
+    history = parse_rate_history(get_entry_value(entry, CONF_RATE_HISTORY, DEFAULT_RATE_HISTORY))
+    return _with_rate_history(definitions, history)
+
+
+def compile_tariffs(definitions: list[TariffDefinition]) -> list[CompiledTariff]:
+    return [CompiledTariff(d) for d in definitions]
+
+
+@dataclass
+class WindowEvaluation:
+    """Zone kWh per tariff for one point series (totals and per local day)."""
+
+    totals: dict[str, tuple[float, ...]]
+    per_day: dict[str, dict[date, tuple[float, ...]]]
+    first_value: float | None
+    last_value: float | None
+    points: int
+    # kWh per (local date, hour, DST flag), only when evaluated with hourly=True.
+    hourly: dict[tuple[date, int, bool], float] = field(default_factory=dict)
+    last_ts: datetime | None = None
+    # Meter resets/replacements seen in the series: (timestamp, value before, value after).
+    resets: list[tuple[datetime, float, float]] = field(default_factory=list)
+
+
+_ONE_SECOND = timedelta(seconds=1)
+
+# A drop below this fraction of the previous reading starts a new monotonic segment (counter
+# reset or meter replacement); smaller drops are treated as reporting noise.
+_RESET_RATIO = 0.9
+
+
+def meter_step(prev_v: float, v: float) -> tuple[float | None, bool]:
+    """kWh between two readings of a total meter, and whether `v` starts a new segment.
+
+    A new segment counts from zero, so its first reading is all energy used since the reset.
+    Noise drops return None: nothing is counted for that step.
+    """
+    d = v - prev_v
+    if d >= 0:
+        return d, False
+    if v < prev_v * _RESET_RATIO:
+        return max(v, 0.0), True
+    return None, False
+
+
+def anchor_at_boundary(
+    points: list[tuple[datetime, float]],
+    boundary: datetime,
+    baseline: tuple[datetime, float] | None,
+) -> list[tuple[datetime, float]]:
+    """Start a window's readings with the meter value at `boundary`.
+
+    `baseline` is the last reading at or before the boundary; the value at the boundary is
+    interpolated linearly between it and the first reading inside the window, so the energy
+    used between the last report before the boundary and the first one after it is split
+    across the two periods instead of being lost.
+    """
+    if baseline is None:
+        return points
+    t0, v0 = baseline
+    if not points or t0 >= boundary:
+        return [(boundary, v0), *points]
+    t1, v1 = points[0]
+    if t1 <= boundary:
+        return points
+    value = v0
+    if v1 >= v0:
+        value = v0 + (v1 - v0) * ((boundary - t0) / (t1 - t0))
+    return [(boundary, value), *points]
+
+
+def find_gaps(
+    points: list[tuple[datetime, float]],
+    start: datetime,
+    end: datetime,
+    min_gap: timedelta,
+) -> list[tuple[datetime, datetime]]:
+    """Spans of at least `min_gap` in [start, end) without a reading, in order.
+
+    Includes the span before the first reading (history the recorder has purged) and the
+    one after the last. A meter that does not move reports nothing either, so a gap is only
+    a candidate: the hourly statistics decide whether energy was used in it.
+    """
+    gaps: list[tuple[datetime, datetime]] = []
+    prev = start
+    for ts, _v in points:
+        if ts - prev >= min_gap:
+            gaps.append((prev, ts))
+        prev = max(prev, ts)
+    if end - prev >= min_gap:
+        gaps.append((prev, end))
+    return gaps
+
+
+def fill_gaps(
+    points: list[tuple[datetime, float]],
+    gaps: list[tuple[datetime, datetime]],
+    hourly: list[tuple[datetime, float]],
+) -> tuple[list[tuple[datetime, float]], timedelta]:
+    """Fill `gaps` in a raw series with hourly statistics rows; returns (merged, time filled).
+
+    `hourly` is cumulative on its own scale (the statistics sum) and stamped at the end of
+    each hour. Inside a gap its increments are laid onto the reading the gap starts from, or
+    counted back from the one it ends at when nothing precedes it (purged history), and are
+    kept between the two so the merged series does not step backwards at the seams.
+
+    Only gaps in which the sum grows are filled and counted: one it stays flat over is a
+    meter that did not move, which the raw history already describes.
+    """
+    if not gaps or not hourly:
+        return points, timedelta(0)
+    values = dict(points)
+    stamps = [ts for ts, _s in hourly]
+    fill: list[tuple[datetime, float]] = []
+    filled = timedelta(0)
+
+    for a, b in gaps:
+        va = values.get(a)
+        vb = values.get(b)
+        # With nothing read at its start, a row stamped exactly there gives the start value.
+        i = bisect_right(stamps, a) if va is not None else bisect_left(stamps, a)
+        j = bisect_left(stamps, b)
+        if i >= j:
+            continue
+        if va is not None:
+            # The sum at the last row before the gap stands for the reading it starts from.
+            ref = hourly[i - 1][1] if i > 0 else hourly[i][1]
+            offset = va - ref
+            grown = hourly[j - 1][1] > ref
+        elif vb is not None:
+            # Counted back from the row at or before the reading the gap ends at.
+            ref = hourly[i][1]
+            end = hourly[bisect_right(stamps, b) - 1][1]
+            offset = vb - end
+            grown = end > ref
+        else:
+            continue
+        if not grown:
+            continue
+        low = va if va is not None else float("-inf")
+        high = vb if vb is not None and (va is None or vb >= va) else float("inf")
+        fill.extend((ts, min(max(s + offset, low), high)) for ts, s in hourly[i:j])
+        filled += b - a
+
+    if not fill:
+        return points, timedelta(0)
+    return list(heapq.merge(points, fill, key=lambda p: p[0])), filled
+
+
+class MultiTariffEvaluator:
+    """Walks a point series once and accumulates zone buckets for every registered tariff."""
+
+    def __init__(self, tariffs: list[CompiledTariff]) -> None:
+        self.tariffs = tariffs
+
+    def evaluate(self, points: list[tuple[datetime, float]], tz, hourly: bool = False) -> WindowEvaluation:
+        tariffs = self.tariffs
+        hourly_kwh: dict[tuple[date, int, bool], float] = {}
+        totals = [[0.0] * len(t.zones) for t in tariffs]
+        per_day: list[dict[date, list[float]]] = [{} for _ in tariffs]
+        # Zone tables only depend on (local date, DST flag); look them up once per day.
+        tables_by_day: dict[tuple[date, bool], list[bytes]] = {}
+
+        resets: list[tuple[datetime, float, float]] = []
+        if len(points) >= 2:
+            prev_v = points[0][1]
+            for ts_utc, v in points[1:]:
+                d, reset = meter_step(prev_v, v)
+                if reset:
+                    resets.append((ts_utc, prev_v, v))
+                prev_v = v
+                if d is None:
+                    continue
+                local_end = ts_utc.astimezone(tz)
+                day = local_end.date()
+                key = (day, is_summer(local_end))
+                tables = tables_by_day.get(key)
+                if tables is None:
+                    tables = [t.table_for(local_end) for t in tariffs]
+                    tables_by_day[key] = tables
+                minute = local_end.hour * 60 + local_end.minute
+                for i, table in enumerate(tables):
+                    zone = table[minute]
+                    totals[i][zone] += d
+                    bucket = per_day[i].get(day)
+                    if bucket is None:
+                        bucket = per_day[i][day] = [0.0] * len(tariffs[i].zones)
+                    bucket[zone] += d
+                if hourly:
+                    # A reading stamped exactly on the hour closes the previous hour.
+                    hour_of = local_end - _ONE_SECOND
+                    hk = (hour_of.date(), hour_of.hour, is_summer(hour_of))
+                    hourly_kwh[hk] = hourly_kwh.get(hk, 0.0) + d
+
+        return WindowEvaluation(
+            totals={t.key: tuple(totals[i]) for i, t in enumerate(tariffs)},
+            per_day={
+                t.key: {day: tuple(b) for day, b in per_day[i].items()}
+                for i, t in enumerate(tariffs)
+            },
+            first_value=points[0][1] if points else None,
+            last_value=points[-1][1] if points else None,
+            points=len(points),
+            hourly=hourly_kwh,
+            last_ts=points[-1][0] if points else None,
+            resets=resets,
+        )
+
+    def extend(self, evaluation: WindowEvaluation, ts_utc: datetime, value: float, tz) -> bool:
+        """Fold one newer reading into `evaluation` in place, in O(number of tariffs).
+
+        Returns False (leaving it untouched) when there is no previous reading, the reading
+        is not newer, or `evaluation` was made for a different set of tariffs; the caller
+        should then re-evaluate the window. Resets start a new segment here just as they do
+        in evaluate().
+        """
+        prev_v = evaluation.last_value
+        if prev_v is None or evaluation.last_ts is None or ts_utc < evaluation.last_ts:
+            return False
+        if any(t.key not in evaluation.totals for t in self.tariffs):
+            return False
+        d, reset = meter_step(prev_v, value)
+        if reset:
+            evaluation.resets.append((ts_utc, prev_v, value))
+        if d is None:
+            evaluation.last_value = value
+            evaluation.last_ts = ts_utc
+            evaluation.points += 1
+            return True
+
+        local_end = ts_utc.astimezone(tz)
+        day = local_end.date()
+        minute = local_end.hour * 60 + local_end.minute
+        for t in self.tariffs:
+            zone = t.table_for(local_end)[minute]
+            totals = list(evaluation.totals[t.key])
+            totals[zone] += d
+            evaluation.totals[t.key] = tuple(totals)
+            per_day = evaluation.per_day[t.key]
+            bucket = list(per_day.get(day) or (0.0,) * len(t.zones))
+            bucket[zone] += d
+            per_day[day] = tuple(bucket)
+
+        hour_of = local_end - _ONE_SECOND
+        hk = (hour_of.date(), hour_of.hour, is_summer(hour_of))
+        evaluation.hourly[hk] = evaluation.hourly.get(hk, 0.0) + d
+        evaluation.last_value = value
+        evaluation.last_ts = ts_utc
+        evaluation.points += 1
+        return True
+
+
+def period_range_local(now_local: datetime, period: str) -> tuple[datetime, datetime]:
+    start_of_today = now_local.replace(hour=0, minute=0, second=0, microsecond=0)
+    start_of_year = start_of_today.replace(month=1, day=1)
+
+    if period == "today":
+        return start_of_today, now_local
+    if period == "week":
+        start = start_of_today - timedelta(days=start_of_today.weekday())  # Monday
+        return start, now_local
+    if period == "month":
+        start = start_of_today.replace(day=1)
+        return start, now_local
+    if period == "year":
+        return start_of_year, now_local
+    if period == "last_year":
+        start_last_year = start_of_year.replace(year=start_of_year.year - 1)
+        return start_last_year, start_of_year
+
+    raise ValueError(f"unknown period: {period}")
+
+
+def next_period_start_local(now_local: datetime, period: str) -> datetime:
+    """Start of the window that follows the current `period` window."""
+    start, _ = period_range_local(now_local, period)
+    if period == "today":
+        return start + timedelta(days=1)
+    if period == "week":
+        return start + timedelta(days=7)
+    if period == "month":
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start.replace(year=start.year + 1)  # year / last_year
+
+
+def compile_tariff_boundaries(tariffs: list[CompiledTariff]) -> list[time]:
+    """All zone switch times across the compiled tariffs, sorted (midnight excluded)."""
+    out: set[time] = set()
+    for tariff in tariffs:
+        for rule in tariff.definition.rules:
+            for w in rule.windows:
+                for minute in (w.start_minute, w.end_minute):
+                    if 0 < minute < 1440:
+                        out.add(time(minute // 60, minute % 60))
+    return sorted(out)
+
+
+def next_tariff_boundary_local(now_local: datetime, boundaries: list[time]) -> datetime | None:
+    tz = now_local.tzinfo
+    for offset in (0, 1):
+        day = now_local.date() + timedelta(days=offset)
+        for t in boundaries:
+            candidate = datetime.combine(day, t, tzinfo=tz)
+            if candidate > now_local:
+                return candidate
+    return None
+
+
+class DailyZoneRollup:
+    """Per-day zone kWh vectors per tariff, fed by the window evaluations.
+
+    "G11" is maintained implicitly as (total_kwh,) from any tariff's buckets.
+    """
+
+    def __init__(self) -> None:
+        self._days: dict[str, dict[date, tuple[float, ...]]] = {}
+
+    def merge(self, tariff: str, per_day: dict[date, tuple[float, ...]]) -> None:
+        days = self._days.setdefault(tariff, {})
+        totals = self._days.setdefault("G11", {})
+        for d, zones in per_day.items():
+            days[d] = tuple(zones)
+            totals[d] = (sum(zones),)
+
+    def get(self, tariff: str, d: date) -> tuple[float, ...] | None:
+        return self._days.get(tariff, {}).get(d)
+
+    def prune(self, keep_from: date) -> None:
+        for days in self._days.values():
+            for d in [d for d in days if d < keep_from]:
+                del days[d]
+
+    def weekday_profile(self, tariff: str, weekday: int, before: date, weeks: int) -> tuple[float, ...] | None:
+        """Mean zone kWh over the last `weeks` days with this weekday strictly before `before`."""
+        days = self._days.get(tariff, {})
+        latest = before - timedelta(days=((before.weekday() - weekday - 1) % 7) + 1)
+        samples = [
+            days[d]
+            for d in (latest - timedelta(days=7 * i) for i in range(weeks))
+            if d in days
+        ]
+        if not samples:
+            return None
+        return tuple(sum(zone) / len(samples) for zone in zip(*samples))
+
+
+class HourOfWeekMatrix:
+    """kWh per (season, weekday, hour) for one period, folded in from closed hours only.
+
+    Per-tariff zone totals are kept alongside the 2 x 7 x 24 cells as hours are added,
+    so shift_savings() is constant time.
+    """
+
+    def __init__(self, tariffs: list[CompiledTariff]) -> None:
+        self._tariffs = {t.key: t for t in tariffs}
+        self.cells: dict[str, list[list[float]]] = {
+            season: [[0.0] * 24 for _ in range(7)] for season in ("summer", "winter")
+        }
+        self.zone_kwh: dict[str, list[float]] = {t.key: [0.0] * len(t.zones) for t in tariffs}
+        # Last (local date, hour) folded in; later evaluations only add hours after it.
+        self.through: tuple[date, int] | None = None
+
+    def add_closed_hours(self, hourly: dict[tuple[date, int, bool], float], before: tuple[date, int]) -> int:
+        """Fold in the hours strictly before `before` that are not in the matrix yet."""
+        added = 0
+        for (d, hour, dst), kwh in sorted(hourly.items()):
+            if (d, hour) >= before:
+                break
+            if self.through is not None and (d, hour) <= self.through:
+                continue
+            self.cells["summer" if dst else "winter"][d.weekday()][hour] += kwh
+            for key, t in self._tariffs.items():
+                self.zone_kwh[key][t.zone_for(d, hour * 60, dst)] += kwh
+            self.through = (d, hour)
+            added += 1
+        return added
+
+    def shift_savings(
+        self, tariff: str, kwh: float, from_zone: str, to_zone: str, on: date
+    ) -> dict[str, float]:
+        """Savings from moving up to `kwh` of this period's `from_zone` use into `to_zone`.
+
+        Priced at the rates in effect on `on`, normally the period's last day.
+        """
+        t = self._tariffs[tariff]
+        i = t.zones.index(from_zone)
+        j = t.zones.index(to_zone)
+        rates = t.rates_on(on)
+        shiftable = min(max(kwh, 0.0), self.zone_kwh[tariff][i])
+        return {
+            "shiftable_kwh": shiftable,
+            "from_rate": rates[i],
+            "to_rate": rates[j],
+            "savings_pln": shiftable * (rates[i] - rates[j]),
+        }
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "through": (
+                f"{self.through[0].isoformat()}T{self.through[1]:02d}:00" if self.through else None
+            ),
+            "summer": [[round(v, 4) for v in row] for row in self.cells["summer"]],
+            "winter": [[round(v, 4) for v in row] for row in self.cells["winter"]],
+            "zone_kwh": {
+                key: dict(zip(self._tariffs[key].zones, (round(v, 4) for v in zones)))
+                for key, zones in self.zone_kwh.items()
+            },
+        }
+
+
+def zone_cost(zones_kwh: tuple[float, ...], rates: tuple[float, ...]) -> float:
+    return sum(kwh * rate for kwh, rate in zip(zones_kwh, rates))
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import DATA_SERIES_CACHE, DOMAIN
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    data = hass.data.get(DOMAIN, {})
+    runtime = data.get(entry.entry_id, {})
+    cache = data.get(DATA_SERIES_CACHE)
+    sources = runtime.get("sources")
+    stats = dict(runtime.get("stats", {}))
+
+    # Own recorder load: state writes per hour since setup.
+    started = runtime.get("started")
+    hours = (dt_util.utcnow() - started).total_seconds() / 3600 if started else 0
+    write_rate = round(stats.get("state_writes", 0) / hours, 2) if hours > 0 else None
+
+    # Event-loop vs executor time per window recomputation.
+    updates = stats.get("window_updates", 0)
+    per_update = None
+    if updates:
+        per_update = {
+            "loop_ms": round(stats.get("window_loop_us", 0) / updates / 1000, 3),
+            "executor_ms": round(stats.get("window_executor_us", 0) / updates / 1000, 3),
+        }
+
+    # Counter resets / meter replacements the windows split into monotonic segments.
+    resets = {
+        period: [
+            {"at": ts.isoformat(), "before_kwh": before, "after_kwh": after}
+            for ts, before, after in window.result.resets
+        ]
+        for period, window in runtime.get("windows", {}).items()
+        if window.result is not None and window.result.resets
+    }
+
+    return {
+        "stats": stats,
+        "state_writes_per_hour": write_rate,
+        "window_update_time": per_update,
+        "meter_resets": resets,
+        # Fraction of each window read from raw history and from hourly statistics.
+        "coverage": {period: window.coverage for period, window in runtime.get("windows", {}).items()},
+        "refresh_plan": runtime.get("plan"),
+        # Shared by every entry of the integration.
+        "series_cache": cache.as_dict() if cache is not None else None,
+        "sources": {
+            entity_id: {"value": value, "last_updated": last_updated.isoformat()}
+            for entity_id, (value, last_updated) in (sources.seen.items() if sources else ())
+        },
+    }
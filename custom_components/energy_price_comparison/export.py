@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import csv
+import os
+from collections.abc import Iterator
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.components.recorder.statistics import statistics_during_period
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import EXPORT_CHUNK_DAYS
+from .core import CompiledTariff, meter_step, statistics_row
+
+
+def _iter_hourly_sums(
+    hass: HomeAssistant,
+    statistic_id: str,
+    start_utc: datetime,
+    end_utc: datetime,
+) -> Iterator[list[tuple[datetime, float]]]:
+    """Yield (hour_start_utc, cumulative_sum) rows, one recorder query per chunk."""
+    step = timedelta(days=EXPORT_CHUNK_DAYS)
+    cursor = start_utc
+    while cursor < end_utc:
+        chunk_end = min(cursor + step, end_utc)
+        stats = statistics_during_period(
+            hass=hass,
+            start_time=cursor,
+            end_time=chunk_end,
+            statistic_ids={statistic_id},
+            period="hour",
+            types={"sum", "state"},
+            units=None,
+        )
+        yield [row for r in stats.get(statistic_id) or [] if (row := statistics_row(r)) is not None]
+        cursor = chunk_end
+
+
+def _iter_hourly_kwh(
+    chunks: Iterator[list[tuple[datetime, float]]],
+) -> Iterator[list[tuple[datetime, float]]]:
+    """Turn cumulative sums into per-hour kWh; the very first row only seeds the baseline."""
+    prev: float | None = None
+    for rows in chunks:
+        out: list[tuple[datetime, float]] = []
+        for start_utc, total in rows:
+            if prev is not None:
+                # Same rule as the sensors: resets start a new segment, noise drops count nothing.
+                kwh, _reset = meter_step(prev, total)
+                out.append((start_utc, kwh or 0.0))
+            prev = total
+        yield out
+
+
+def _iter_rows(
+    hourly: Iterator[list[tuple[datetime, float]]],
+    tz,
+    tariffs: list[CompiledTariff],
+) -> Iterator[list[dict[str, Any]]]:
+    for chunk in hourly:
+        rows: list[dict[str, Any]] = []
+        for start_utc, kwh in chunk:
+            local = start_utc.astimezone(tz)
+            row: dict[str, Any] = {"hour_start": local.isoformat(), "kwh": round(kwh, 6)}
+            for t in tariffs:
+                zone = t.zone_at(local)
+                row[f"{t.key.lower()}_zone"] = t.zones[zone]
+                row[f"{t.key.lower()}_cost_pln"] = round(kwh * t.rates_on(local.date())[zone], 6)
+            rows.append(row)
+        yield rows
+
+
+def _write_csv(chunks: Iterator[list[dict[str, Any]]], fieldnames: list[str], path: str) -> int:
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for rows in chunks:
+            writer.writerows(rows)
+            f.flush()
+            count += len(rows)
+    return count
+
+
+def _write_parquet(chunks: Iterator[list[dict[str, Any]]], fieldnames: list[str], path: str) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as err:
+        raise HomeAssistantError("Parquet export requires pyarrow to be installed") from err
+
+    schema = pa.schema(
+        [
+            (name, pa.string() if name == "hour_start" or name.endswith("_zone") else pa.float64())
+            for name in fieldnames
+        ]
+    )
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for rows in chunks:
+            if rows:
+                writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+                count += len(rows)
+    return count
+
+
+def export_hourly_breakdown(
+    hass: HomeAssistant,
+    *,
+    statistic_id: str,
+    tariffs: list[CompiledTariff],
+    start_utc: datetime,
+    end_utc: datetime,
+    tz,
+    path: str,
+    fmt: str,
+) -> int:
+    """Stream hourly statistics into `path` chunk by chunk. Blocking: run in the recorder executor."""
+    fieldnames = ["hour_start", "kwh"]
+    for t in tariffs:
+        fieldnames += [f"{t.key.lower()}_zone", f"{t.key.lower()}_cost_pln"]
+
+    # One extra hour in front so the first exported hour has a baseline.
+    sums = _iter_hourly_sums(hass, statistic_id, start_utc - timedelta(hours=1), end_utc)
+    chunks = _iter_rows(_iter_hourly_kwh(sums), tz, tariffs)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.part"
+    try:
+        if fmt == "parquet":
+            count = _write_parquet(chunks, fieldnames, tmp_path)
+        else:
+            count = _write_csv(chunks, fieldnames, tmp_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+    return count
@@ -1,21 +1,29 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta
-from typing import Any, Callable
-
-from homeassistant.components.sensor import SensorEntity
+import asyncio
+import copy
+import logging
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import HomeAssistant, State, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.event import async_track_state_change_event, async_track_time_interval
+from homeassistant.helpers.event import async_track_point_in_utc_time, async_track_state_change_event
 from homeassistant.util import dt as dt_util
 
-from homeassistant.components.recorder import get_instance
-from homeassistant.components.recorder.history import get_significant_states
-from homeassistant.components.recorder.statistics import statistics_during_period
+# Recorder modules are imported on first use (see _recorder below), so loading the platform
+# does not pull in history/statistics.
 
 from .const import (
+    DOMAIN,
+    DATA_SERIES_CACHE,
+    PRICE_SENSOR_UNIQUE_ID,
     CONF_PRICE_ENTITY,
     CONF_TOTAL_ENERGY_ENTITY,
     DEFAULT_TOTAL_ENERGY_ENTITY,
@@ -64,103 +72,110 @@ from .const import (
     CONF_G12N_NIGHT_START,
     DEFAULT_G12N_DAY_START,
     DEFAULT_G12N_NIGHT_START,
+    # G13 rates + ranges
+    CONF_G13_MORNING_PEAK_RATE,
+    CONF_G13_AFTERNOON_PEAK_RATE,
+    CONF_G13_OFF_PEAK_RATE,
+    DEFAULT_G13_MORNING_PEAK_RATE,
+    DEFAULT_G13_AFTERNOON_PEAK_RATE,
+    DEFAULT_G13_OFF_PEAK_RATE,
+    CONF_G13_MORNING_PEAK_START,
+    CONF_G13_MORNING_PEAK_END,
+    CONF_G13_AFTERNOON_PEAK_SUMMER_START,
+    CONF_G13_AFTERNOON_PEAK_SUMMER_END,
+    CONF_G13_AFTERNOON_PEAK_WINTER_START,
+    CONF_G13_AFTERNOON_PEAK_WINTER_END,
+    DEFAULT_G13_MORNING_PEAK_START,
+    DEFAULT_G13_MORNING_PEAK_END,
+    DEFAULT_G13_AFTERNOON_PEAK_SUMMER_START,
+    DEFAULT_G13_AFTERNOON_PEAK_SUMMER_END,
+    DEFAULT_G13_AFTERNOON_PEAK_WINTER_START,
+    DEFAULT_G13_AFTERNOON_PEAK_WINTER_END,
+    PROJECTION_PROFILE_WEEKS,
+    ROLLOVER_PREWARM_SECONDS,
+    CONF_CURRENT_TARIFF,
+    DEFAULT_CURRENT_TARIFF,
+    IDLE_REFRESH_INTERVAL_MINUTES,
+    SOURCE_SETTLE_SECONDS,
+    HISTORY_GAP_HOURS,
+    CONF_SQL_HOURLY_AGGREGATION,
+    DEFAULT_SQL_HOURLY_AGGREGATION,
+    CONF_COMPACT_MODE,
+    DEFAULT_COMPACT_MODE,
+)
+from .cache import SeriesCache
+from .core import (
+    CompiledTariff,
+    DailyZoneRollup,
+    HourOfWeekMatrix,
+    MultiTariffEvaluator,
+    WindowEvaluation,
+    anchor_at_boundary,
+    build_tariff_definitions,
+    compile_tariffs,
+    as_float,
+    compile_tariff_boundaries,
+    fill_gaps,
+    find_gaps,
+    fmt_rate,
+    get_entry_value,
+    next_period_start_local,
+    next_tariff_boundary_local,
+    period_range_local,
+    statistics_row,
+    zone_cost,
 )
 
 
-def _as_float(state: str | None) -> float | None:
-    if state in (None, STATE_UNKNOWN, STATE_UNAVAILABLE):
-        return None
-    try:
-        return float(state)
-    except (TypeError, ValueError):
-        return None
-
-
-def _get_entry_value(entry: ConfigEntry, key: str, default: Any) -> Any:
-    """Read from entry.options -> entry.data -> default."""
-    if entry.options and key in entry.options:
-        return entry.options[key]
-    if entry.data and key in entry.data:
-        return entry.data[key]
-    return default
-
-
-def _is_summer(local_dt: datetime) -> bool:
-    dst = local_dt.dst()
-    return bool(dst and dst != timedelta(0))
-
-
-def _is_day_tariff_g12(local_dt: datetime, cfg: dict[str, str]) -> bool:
-    summer = _is_summer(local_dt)
-
-    day1 = cfg["day_range_1_start"]
-    day2 = cfg["day_range_2_summer_start"] if summer else cfg["day_range_2_winter_start"]
-    night1 = cfg["night_range_1_summer_start"] if summer else cfg["night_range_1_winter_start"]
-    night2 = cfg["night_range_2_start"]
-
-    hm = local_dt.strftime("%H:%M")
-    return (day1 <= hm < night1) or (day2 <= hm < night2)
-
+_LOGGER = logging.getLogger(__name__)
 
-def _is_day_tariff_g12w(local_dt: datetime, cfg: dict[str, str]) -> bool:
-    if local_dt.weekday() >= 5:  # Sat/Sun
-        return False
-    return _is_day_tariff_g12(local_dt, cfg)
 
+async def _gather_windows(action: str, calls: dict[str, Awaitable[Any]]) -> dict[str, Any]:
+    """Await one call per period window; a failing window is logged and yields None."""
+    results = await asyncio.gather(*calls.values(), return_exceptions=True)
+    out: dict[str, Any] = {}
+    for period, result in zip(calls, results):
+        if isinstance(result, BaseException):
+            if not isinstance(result, Exception):
+                raise result
+            _LOGGER.error("Could not %s the %s window: %s", action, period, result, exc_info=result)
+            result = None
+        out[period] = result
+    return out
 
-def _is_day_tariff_g12n(local_dt: datetime, cfg: dict[str, str]) -> bool:
-    if local_dt.weekday() == 6:  # Sunday
-        return False
-    day_start = cfg["day_start"]
-    night_start = cfg["night_start"]
-    hm = local_dt.strftime("%H:%M")
-    return (hm >= day_start) or (hm < night_start)
 
+def _recorder(hass: HomeAssistant):
+    from homeassistant.components.recorder import get_instance
 
-def _period_range_local(now_local: datetime, period: str) -> tuple[datetime, datetime]:
-    start_of_today = now_local.replace(hour=0, minute=0, second=0, microsecond=0)
-    start_of_year = start_of_today.replace(month=1, day=1)
+    return get_instance(hass)
 
-    if period == "week":
-        start = start_of_today - timedelta(days=start_of_today.weekday())  # Monday
-        return start, now_local
-    if period == "month":
-        start = start_of_today.replace(day=1)
-        return start, now_local
-    if period == "year":
-        return start_of_year, now_local
-    if period == "last_year":
-        start_last_year = start_of_year.replace(year=start_of_year.year - 1)
-        return start_last_year, start_of_year
 
-    raise ValueError(f"unknown period: {period}")
+# The readers below are blocking: they run inside one recorder executor job together with
+# the parsing and tariff classification (see _PeriodWindow), never on the event loop.
 
 
-async def _fetch_history_states(
+def _history_points(
     hass: HomeAssistant,
     entity_id: str,
     start_utc: datetime,
     end_utc: datetime,
 ) -> list[tuple[datetime, float]]:
-    if hass is None:
-        return []
-
-    def _job():
-        return get_significant_states(
-            hass=hass,
-            start_time=start_utc,
-            end_time=end_utc,
-            entity_ids=[entity_id],
-            significant_changes_only=False,
-            minimal_response=False,
-        )
-
-    data = await get_instance(hass).async_add_executor_job(_job)
+    from homeassistant.components.recorder.history import get_significant_states
+
+    data = get_significant_states(
+        hass=hass,
+        start_time=start_utc,
+        end_time=end_utc,
+        entity_ids=[entity_id],
+        include_start_time_state=False,
+        significant_changes_only=False,
+        minimal_response=False,
+    )
     states = data.get(entity_id, [])
     points: list[tuple[datetime, float]] = []
 
     for st in states:
-        v = _as_float(st.state)
+        v = as_float(st.state)
         if v is None:
             continue
         ts = st.last_updated or st.last_changed
@@ -172,72 +187,789 @@ async def _fetch_history_states(
     return points
 
 
-async def _fetch_lts_hourly_totals(
+# Per-hour first/last readings of one entity, grouped in the database. Hours are bucketed on
+# (ts + utc offset) so they follow local hours. Non-numeric states are filtered per dialect.
+_HOURLY_STATES_SQL: dict[str, str] = {
+    "sqlite": """
+        SELECT CAST((s.last_updated_ts + :offset) / 3600 AS INTEGER) AS hour_bucket,
+               MIN(s.last_updated_ts), MIN(CAST(s.state AS REAL)),
+               MAX(s.last_updated_ts), MAX(CAST(s.state AS REAL))
+        FROM states s JOIN states_meta m ON s.metadata_id = m.metadata_id
+        WHERE m.entity_id = :entity_id
+          AND s.last_updated_ts >= :start_ts AND s.last_updated_ts < :end_ts
+          AND s.state GLOB '[0-9-]*'
+        GROUP BY hour_bucket ORDER BY hour_bucket
+    """,
+    "postgresql": """
+        SELECT FLOOR((s.last_updated_ts + :offset) / 3600) AS hour_bucket,
+               MIN(s.last_updated_ts), MIN(CAST(s.state AS DOUBLE PRECISION)),
+               MAX(s.last_updated_ts), MAX(CAST(s.state AS DOUBLE PRECISION))
+        FROM states s JOIN states_meta m ON s.metadata_id = m.metadata_id
+        WHERE m.entity_id = :entity_id
+          AND s.last_updated_ts >= :start_ts AND s.last_updated_ts < :end_ts
+          AND s.state ~ '^-?[0-9]+([.][0-9]+)?$'
+        GROUP BY hour_bucket ORDER BY hour_bucket
+    """,
+    "mysql": """
+        SELECT FLOOR((s.last_updated_ts + :offset) / 3600) AS hour_bucket,
+               MIN(s.last_updated_ts), MIN(CAST(s.state AS DOUBLE)),
+               MAX(s.last_updated_ts), MAX(CAST(s.state AS DOUBLE))
+        FROM states s JOIN states_meta m ON s.metadata_id = m.metadata_id
+        WHERE m.entity_id = :entity_id
+          AND s.last_updated_ts >= :start_ts AND s.last_updated_ts < :end_ts
+          AND s.state REGEXP '^-?[0-9]+([.][0-9]+)?$'
+        GROUP BY hour_bucket ORDER BY hour_bucket
+    """,
+}
+
+
+def _hourly_aggregated_points(
+    hass: HomeAssistant,
+    dialect: str,
+    entity_id: str,
+    start_utc: datetime,
+    end_utc: datetime,
+    offset: timedelta,
+) -> list[tuple[datetime, float]] | None:
+    """Hourly-reduced history: the window's first reading, then each hour's last reading.
+
+    Returns None when the database engine is not supported or the query fails, so the
+    caller can fall back to _history_points.
+    """
+    sql = _HOURLY_STATES_SQL.get(dialect)
+    if sql is None:
+        return None
+
+    from sqlalchemy import text
+    from sqlalchemy.exc import SQLAlchemyError
+    from homeassistant.components.recorder.util import session_scope
+
+    try:
+        with session_scope(hass=hass, read_only=True) as session:
+            rows = session.execute(
+                text(sql),
+                {
+                    "entity_id": entity_id,
+                    "start_ts": start_utc.timestamp(),
+                    "end_ts": end_utc.timestamp(),
+                    "offset": int(offset.total_seconds()),
+                },
+            ).all()
+    except SQLAlchemyError:
+        return None
+
+    points: list[tuple[datetime, float]] = []
+    for i, (_bucket, first_ts, first_v, last_ts, last_v) in enumerate(rows):
+        if i == 0 and first_ts != last_ts:
+            points.append((dt_util.utc_from_timestamp(first_ts), float(first_v)))
+        points.append((dt_util.utc_from_timestamp(last_ts), float(last_v)))
+    return points
+
+
+def _lts_hourly_points(
     hass: HomeAssistant,
     statistic_id: str,
     start_utc: datetime,
     end_utc: datetime,
 ) -> list[tuple[datetime, float]]:
-    if hass is None:
-        return []
-
-    def _job():
-        return statistics_during_period(
-            hass=hass,
-            start_time=start_utc,
-            end_time=end_utc,
-            statistic_ids={statistic_id},
-            period="hour",
-            types={"sum", "state"},
-            units=None,
-        )
-
-    stats = await get_instance(hass).async_add_executor_job(_job)
-    rows = stats.get(statistic_id) or []
+    from homeassistant.components.recorder.statistics import statistics_during_period
+
+    stats = statistics_during_period(
+        hass=hass,
+        start_time=start_utc,
+        end_time=end_utc,
+        statistic_ids={statistic_id},
+        period="hour",
+        types={"sum", "state"},
+        units=None,
+    )
     out: list[tuple[datetime, float]] = []
 
-    for r in rows:
-        start_ts = r.get("start")
-        if not isinstance(start_ts, datetime):
-            continue
-        end_ts = dt_util.as_utc(start_ts + timedelta(hours=1))
-
-        v = r.get("sum")
-        if v is None:
-            v = r.get("state")
-        try:
-            fv = float(v)
-        except (TypeError, ValueError):
-            continue
-        out.append((end_ts, fv))
+    for r in stats.get(statistic_id) or []:
+        row = statistics_row(r)
+        if row is not None:
+            # Stamped at the end of the hour, when the sum was reached.
+            out.append((row[0] + timedelta(hours=1), row[1]))
 
     out.sort(key=lambda x: x[0])
     return out
 
 
-def _sum_deltas_by_tariff(
+# The last reading at or before a boundary: one row off the (metadata_id, timestamp) index.
+# Statistics rows are stamped at the end of their hour, like _lts_hourly_points does.
+_BASELINE_SQL: dict[str, str] = {
+    "states": """
+        SELECT s.last_updated_ts, s.state
+        FROM states s
+        WHERE s.metadata_id = (SELECT metadata_id FROM states_meta WHERE entity_id = :entity_id)
+          AND s.last_updated_ts <= :ts
+          AND s.state NOT IN ('unknown', 'unavailable', '')
+        ORDER BY s.last_updated_ts DESC LIMIT 1
+    """,
+    "statistics": """
+        SELECT st.start_ts + 3600, COALESCE(st.sum, st.state)
+        FROM statistics st
+        WHERE st.metadata_id = (SELECT id FROM statistics_meta WHERE statistic_id = :entity_id)
+          AND st.start_ts <= :ts - 3600
+        ORDER BY st.start_ts DESC LIMIT 1
+    """,
+}
+
+
+def _baseline_point(
+    hass: HomeAssistant,
+    entity_id: str,
+    boundary_utc: datetime,
+    source: str,
+) -> tuple[datetime, float] | None:
+    """Last reading at or before `boundary_utc` from states or statistics (sums)."""
+    from sqlalchemy import text
+    from sqlalchemy.exc import SQLAlchemyError
+    from homeassistant.components.recorder.util import session_scope
+
+    try:
+        with session_scope(hass=hass, read_only=True) as session:
+            row = session.execute(
+                text(_BASELINE_SQL[source]),
+                {"entity_id": entity_id, "ts": boundary_utc.timestamp()},
+            ).first()
+    except SQLAlchemyError:
+        return None
+    if row is None:
+        return None
+    try:
+        return dt_util.utc_from_timestamp(float(row[0])), float(row[1])
+    except (TypeError, ValueError):
+        return None
+
+
+def _fill_from_statistics(
+    hass: HomeAssistant,
+    entity_id: str,
     points: list[tuple[datetime, float]],
-    tz,
-    is_day_fn: Callable[[datetime], bool],
-) -> tuple[float, float]:
-    if len(points) < 2:
-        return 0.0, 0.0
-
-    day = 0.0
-    night = 0.0
-    prev_v = points[0][1]
-
-    for ts_utc, v in points[1:]:
-        d = v - prev_v
-        if d >= 0:
-            local_end = dt_util.as_local(ts_utc).astimezone(tz)
-            if is_day_fn(local_end):
-                day += d
+    start_utc: datetime,
+    end_utc: datetime,
+    baselines: _BoundaryBaselines,
+    lts: Callable[[datetime], list[tuple[datetime, float]] | None],
+) -> tuple[list[tuple[datetime, float]], timedelta]:
+    """Fill the spans raw history lacks from hourly statistics; returns (points, time filled).
+
+    `lts(until)` reads the hourly rows from `start_utc` on. Blocking, like the readers above.
+    """
+    gaps = find_gaps(points, start_utc, end_utc, timedelta(hours=HISTORY_GAP_HOURS))
+    if not gaps or not (hourly := lts(gaps[-1][1])):
+        return points, timedelta(0)
+    if gaps[0][0] == start_utc:
+        # A purged lead-in starts from the statistics sum at the boundary.
+        baseline = baselines.get(hass, entity_id, start_utc, "statistics")
+        if baseline is not None and baseline[0] < hourly[0][0]:
+            hourly = [baseline, *hourly]
+    return fill_gaps(points, gaps, hourly)
+
+
+class _BoundaryBaselines:
+    """Baseline readings per (entity, boundary, source), shared by every window of an entry.
+
+    Several periods start at the same instant (midnight on the 1st starts today and the
+    month), and a boundary's baseline never changes once the recorder has committed the
+    readings before it, so each one is looked up once. get() blocks and runs inside the
+    windows' executor jobs, several at once, so the cache is guarded by a lock; the
+    recorder reads run outside it.
+    """
+
+    _MAX_ENTRIES = 32
+
+    def __init__(self, stats: dict[str, int]) -> None:
+        self._stats = stats
+        self._cache: dict[tuple[str, datetime, str], tuple[datetime, float] | None] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self, hass: HomeAssistant, entity_id: str, boundary_utc: datetime, source: str
+    ) -> tuple[datetime, float] | None:
+        key = (entity_id, boundary_utc, source)
+        with self._lock:
+            if key in self._cache:
+                return self._cache[key]
+        point = _baseline_point(hass, entity_id, boundary_utc, source)
+        # Right after a boundary the last reading before it may still be in the recorder queue.
+        settled = dt_util.utcnow() - boundary_utc >= timedelta(seconds=SOURCE_SETTLE_SECONDS)
+        with self._lock:
+            self._stats["baseline_lookups"] = self._stats.get("baseline_lookups", 0) + 1
+            if settled:
+                if len(self._cache) >= self._MAX_ENTRIES:
+                    self._cache.pop(next(iter(self._cache)))
+                self._cache[key] = point
+        return point
+
+
+class _SourceTracker:
+    """Last seen (value, last_updated) per source entity, used to skip no-op recomputations."""
+
+    def __init__(self, hass: HomeAssistant, stats: dict[str, int]) -> None:
+        self._hass = hass
+        self._stats = stats
+        self.seen: dict[str, tuple[float | None, datetime]] = {}
+
+    def fingerprint(self, entity_id: str) -> tuple[float | None, datetime] | None:
+        st = self._hass.states.get(entity_id)
+        if st is None:
+            return None
+        fp = (as_float(st.state), st.last_updated)
+        self.seen[entity_id] = fp
+        return fp
+
+    @staticmethod
+    def settled(fp: tuple[float | None, datetime] | None) -> bool:
+        # Only trust a fingerprint once the recorder has had time to commit that reading.
+        if fp is None:
+            return False
+        return dt_util.utcnow() - fp[1] >= timedelta(seconds=SOURCE_SETTLE_SECONDS)
+
+    def count_skip(self) -> None:
+        self._stats["skipped_updates"] = self._stats.get("skipped_updates", 0) + 1
+
+
+class _PeriodWindow:
+    """One recorder fetch and one pass over every tariff per period; cost sensors render from it."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        *,
+        period: str,
+        total_entity_id: str,
+        evaluator: MultiTariffEvaluator,
+        rollup: DailyZoneRollup,
+        sources: _SourceTracker,
+        baselines: _BoundaryBaselines,
+        series: SeriesCache,
+        stats: dict[str, int],
+        sql_hourly: bool = False,
+    ) -> None:
+        self.hass = hass
+        self.period = period
+        self.total_entity_id = total_entity_id
+        self._evaluator = evaluator
+        self._rollup = rollup
+        self._sources = sources
+        self._baselines = baselines
+        self._series = series
+        self._sql_hourly = sql_hourly
+        self._stats = stats
+        self._last_key: tuple[Any, ...] | None = None
+        # (start, end) of a range taken over final from a predecessor; not recomputed.
+        self._adopted: tuple[datetime, datetime] | None = None
+        # Bumped by invalidate(), so a run started before it does not mark itself current.
+        self._generation = 0
+        self._running = False
+        self._dirty = False
+
+        self.start_local, self.end_local = period_range_local(dt_util.now(), period)
+        self.resolution = "history"
+        # Fraction of the window read from each source.
+        self.coverage: dict[str, float] = {}
+        self.now_source: str | None = None
+        self.result: WindowEvaluation | None = None
+        self.profile = HourOfWeekMatrix(evaluator.tariffs)
+        self._profile_start: datetime | None = None
+
+    @property
+    def last_day(self) -> date:
+        """Last local day the window covers (today for the running periods)."""
+        return (self.end_local - timedelta(microseconds=1)).date()
+
+    async def async_refresh(self) -> bool:
+        """Recompute the window; False when there is nothing new for the caller to render.
+
+        Single-flight: a request arriving while a run is in flight only marks the window
+        dirty, and the running caller does one follow-up run before it returns.
+        """
+        if self._running:
+            self._dirty = True
+            self._stats["overlapping_refreshes"] = self._stats.get("overlapping_refreshes", 0) + 1
+            return False
+
+        self._running = True
+        try:
+            changed = await self._async_compute()
+            while self._dirty:
+                self._dirty = False
+                changed = await self._async_compute() or changed
+        finally:
+            self._running = False
+        return changed
+
+    async def _async_compute(self) -> bool:
+        loop_started = time.perf_counter()
+        now_local = dt_util.now()
+        tz = dt_util.DEFAULT_TIME_ZONE
+        start_local, end_local = period_range_local(now_local, self.period)
+        start_utc = dt_util.as_utc(start_local)
+        end_utc = dt_util.as_utc(end_local)
+
+        # A window that has ended (last_year) only changes with its range; a running one
+        # changes with every new reading of the total.
+        closed = end_utc <= dt_util.utcnow() - timedelta(seconds=SOURCE_SETTLE_SECONDS)
+        fp = self._sources.fingerprint(self.total_entity_id)
+        key = (start_utc, end_utc) if closed else (start_utc, fp)
+        if key == self._last_key or (start_utc, end_utc) == self._adopted:
+            self._sources.count_skip()
+            return False
+        # Recorded once the job has succeeded, and only if nothing invalidated it meanwhile.
+        new_key = key if closed or self._sources.settled(fp) else None
+        generation = self._generation
+
+        # Everything the job needs from the loop is read here; the job itself never touches
+        # hass.states or the entities.
+        instance = _recorder(self.hass)
+        dialect = None
+        if self._sql_hourly and self.period in ("month", "year", "last_year"):
+            dialect = str(getattr(instance, "dialect_name", None) or "")
+        offset = now_local.utcoffset() or timedelta(0)
+        live_now = None
+        if self.period == "today":
+            st_now = self.hass.states.get(self.total_entity_id)
+            live_now = as_float(st_now.state) if st_now else None
+
+        # The load profile only grows by hours that have closed (and settled in the
+        # recorder) since the last run; a new period starts an empty one. The job folds into
+        # a copy, swapped in on the loop, so services never read a half-folded profile.
+        if start_utc != self._profile_start:
+            profile = HourOfWeekMatrix(self._evaluator.tariffs)
+        else:
+            profile = copy.deepcopy(self.profile)
+        settled = dt_util.as_local(dt_util.utcnow() - timedelta(seconds=SOURCE_SETTLE_SECONDS))
+        hass = self.hass
+        entity_id = self.total_entity_id
+        evaluator = self._evaluator
+        baselines = self._baselines
+        series = self._series
+        settled_utc = dt_util.as_utc(settled)
+
+        def _cached(
+            resolution: str,
+            fetch: Callable[[datetime], list[tuple[datetime, float]] | None],
+            until: datetime = end_utc,
+        ):
+            # Series are shared across entries; only the time not read yet is fetched.
+            # Hourly statistics are compiled after their hour ends, so they settle an hour later.
+            settled_before = settled_utc
+            if resolution == "long_term_statistics":
+                settled_before -= timedelta(hours=1)
+            return series.fetch(
+                (entity_id, start_utc, resolution),
+                lambda since: fetch(since or start_utc),
+                until=until,
+                settled_before=settled_before,
+            )
+
+        def _lts(until: datetime) -> list[tuple[datetime, float]] | None:
+            # Hourly rows are stamped at their end, so the row ending at `since` starts an hour before.
+            return _cached(
+                "long_term_statistics",
+                lambda since: _lts_hourly_points(
+                    hass, entity_id, since - timedelta(hours=1) if since > start_utc else since, until
+                ),
+                until,
+            )
+
+        def _job() -> tuple[str, str | None, WindowEvaluation, dict[str, float]]:
+            # Fetch -> parse -> classify -> reduce in one executor job; only buckets come back.
+            resolution = "history"
+            points = None
+            if dialect is not None:
+                points = _cached(
+                    "history_hourly_sql",
+                    lambda since: _hourly_aggregated_points(hass, dialect, entity_id, since, end_utc, offset),
+                )
+                if points is not None:
+                    resolution = "history_hourly_sql"
+            if points is None:
+                points = _cached("history", lambda since: _history_points(hass, entity_id, since, end_utc))
+            # The window starts at the meter value at its boundary, not at the first report
+            # after it.
+            points = anchor_at_boundary(points, start_utc, baselines.get(hass, entity_id, start_utc, "states"))
+
+            span = (end_utc - start_utc).total_seconds() or 1.0
+            if len(points) >= 2:
+                # Spans the raw history lacks (purged, or recorded while the meter was offline)
+                # are read from the hourly statistics and merged in. Spans the statistics show
+                # no energy in were an idle meter and stay with the history.
+                points, filled = _fill_from_statistics(hass, entity_id, points, start_utc, end_utc, baselines, _lts)
+                coverage = {
+                    "history": round((span - filled.total_seconds()) / span, 4),
+                    "long_term_statistics": round(filled.total_seconds() / span, 4),
+                }
             else:
-                night += d
-        prev_v = v
+                resolution = "long_term_statistics"
+                points = _lts(end_utc) or []
+                points = anchor_at_boundary(
+                    points, start_utc, baselines.get(hass, entity_id, start_utc, "statistics")
+                )
+                coverage = {"history": 0.0, "long_term_statistics": 1.0 if len(points) >= 2 else 0.0}
+
+            now_source = None
+            if self.period == "today" and resolution == "history":
+                if live_now is None:
+                    now_source = "recorder_last_point"
+                else:
+                    now_source = "live_state"
+                    if points:
+                        # The first point is the baseline; the live value replaces the last report.
+                        points = [points[0], *points[1:-1], (end_utc, live_now)]
+
+            result = evaluator.evaluate(points, tz, hourly=True)
+            _fold_closed_hours(profile, result.hourly, (settled.date(), settled.hour))
+            return resolution, now_source, result, coverage
+
+        loop_time = time.perf_counter() - loop_started
+        job_started = time.perf_counter()
+        resolution, now_source, result, coverage = await instance.async_add_executor_job(_job)
+        job_time = time.perf_counter() - job_started
+        loop_started = time.perf_counter()
+
+        # Today's partial buckets come from the today window; other windows contribute
+        # closed days.
+        if self.period == "today":
+            self._merge_today(result)
+        else:
+            today = now_local.date()
+            for tariff, per_day in result.per_day.items():
+                self._rollup.merge(tariff, {d: b for d, b in per_day.items() if d < today})
+
+        self.profile = profile
+        if generation == self._generation:
+            self._last_key = new_key
+            self._profile_start = start_utc
+        self.start_local, self.end_local = start_local, end_local
+        self.resolution = resolution
+        self.coverage = coverage
+        self.now_source = now_source
+        self.result = result
+
+        loop_time += time.perf_counter() - loop_started
+        stats = self._stats
+        stats["window_updates"] = stats.get("window_updates", 0) + 1
+        stats["window_loop_us"] = stats.get("window_loop_us", 0) + int(loop_time * 1_000_000)
+        stats["window_executor_us"] = stats.get("window_executor_us", 0) + int(job_time * 1_000_000)
+        return True
+
+    async def async_close(self, boundary_local: datetime) -> WindowEvaluation | None:
+        """Bring the result up to the period's end with the readings since the last run.
+
+        Used at a rollover, before the window moves on: only the minutes since the last
+        (pre-warm) run are read. Returns the closed result, or None when there is none.
+        Only a result built from raw readings can be extended with raw readings; one from
+        statistics sums is on another scale.
+        """
+        if (
+            self.result is None
+            or self.result.last_ts is None
+            or self._running
+            or self.resolution not in ("history", "history_hourly_sql")
+        ):
+            return None
+        # The job extends copies; renders and services keep reading the current objects
+        # until the closed ones are swapped in here on the loop.
+        result = copy.deepcopy(self.result)
+        profile = copy.deepcopy(self.profile)
+        boundary_utc = dt_util.as_utc(boundary_local)
+        since = result.last_ts
+        hass = self.hass
+        entity_id = self.total_entity_id
+        evaluator = self._evaluator
+        tz = dt_util.DEFAULT_TIME_ZONE
+
+        def _job() -> None:
+            if since < boundary_utc:
+                for ts, v in _history_points(hass, entity_id, since, boundary_utc):
+                    if ts > since:
+                        evaluator.extend(result, ts, v, tz)
+            _fold_closed_hours(profile, result.hourly, (boundary_local.date(), boundary_local.hour))
 
-    return day, night
+        self._running = True
+        try:
+            await _recorder(hass).async_add_executor_job(_job)
+        finally:
+            self._running = False
+            # A refresh requested meanwhile only marked the window dirty. It is served by the
+            # refresh that follows every close; the stale key makes sure that one recomputes.
+            if self._dirty:
+                self._dirty = False
+                self._last_key = None
+        self.result = result
+        self.profile = profile
+        if self.period == "today":
+            self._merge_today(result)
+        else:
+            for tariff, per_day in result.per_day.items():
+                self._rollup.merge(tariff, per_day)
+        return result
+
+    @callback
+    def adopt(self, predecessor: _PeriodWindow, result: WindowEvaluation) -> None:
+        """Take over a closed predecessor's result (This Year becoming Last Year) in one step."""
+        start_local, end_local = period_range_local(dt_util.now(), self.period)
+        self.start_local, self.end_local = start_local, end_local
+        self.resolution = predecessor.resolution
+        self.coverage = predecessor.coverage
+        self.now_source = None
+        self.result = result
+        self.profile = predecessor.profile
+        self._profile_start = dt_util.as_utc(start_local)
+        self._last_key = self._adopted = (dt_util.as_utc(start_local), dt_util.as_utc(end_local))
+        # The successor starts with a fresh profile for its own period.
+        predecessor.invalidate()
+        predecessor.profile = HourOfWeekMatrix(self._evaluator.tariffs)
+        self._stats["window_promotions"] = self._stats.get("window_promotions", 0) + 1
+
+    def invalidate(self) -> None:
+        """Make the next refresh recompute, e.g. after the set of evaluated tariffs changed."""
+        self._last_key = None
+        self._adopted = None
+        self._generation += 1
+        self._profile_start = None
+        if self._running:
+            self._dirty = True
+
+    def _merge_today(self, result: WindowEvaluation) -> None:
+        if result.points < 2:
+            return
+        day = self.start_local.date()
+        for tariff, zones in result.totals.items():
+            self._rollup.merge(tariff, {day: zones})
+
+    @callback
+    def async_apply_state_change(self, old_state: State | None, new_state: State | None) -> bool:
+        """Fold one change of the total into the today window in memory, without a recorder read.
+
+        Returns False when the reading cannot be chained onto the current result: no result
+        yet, a refresh in flight, a new day or a missed reading (the old state is not the value
+        the window ended on). The caller then reconciles with a refresh. Meter resets are
+        chained like any other reading.
+        """
+        result = self.result
+        if self.period != "today" or result is None or self._running or new_state is None:
+            return False
+        value = as_float(new_state.state)
+        if value is None:
+            # Going unavailable adds nothing; coming back shows up as a gap on the next reading.
+            return True
+
+        ts = new_state.last_updated
+        old_value = as_float(old_state.state) if old_state is not None else None
+        if (
+            ts >= dt_util.as_utc(next_period_start_local(self.start_local, self.period))
+            or old_value is None
+            or old_value != result.last_value
+            or not self._evaluator.extend(result, ts, value, dt_util.DEFAULT_TIME_ZONE)
+        ):
+            self._stats["live_reconciles"] = self._stats.get("live_reconciles", 0) + 1
+            return False
+
+        self._merge_today(result)
+        now_local = dt_util.as_local(ts)
+        _fold_closed_hours(self.profile, result.hourly, (now_local.date(), now_local.hour))
+        self.now_source = "live_state"
+        # The window is current for this reading, so the idle refresh has nothing to redo.
+        self._last_key = (dt_util.as_utc(self.start_local), self._sources.fingerprint(self.total_entity_id))
+        self._stats["live_updates"] = self._stats.get("live_updates", 0) + 1
+        return True
+
+
+def _fold_closed_hours(
+    profile: HourOfWeekMatrix, hourly: dict[tuple[date, int, bool], float], before: tuple[date, int]
+) -> None:
+    # Closed hours move into the profile; the open one stays behind for live readings to extend.
+    profile.add_closed_hours(hourly, before)
+    for key in [k for k in hourly if (k[0], k[1]) < before]:
+        del hourly[key]
+
+
+class _DayAggregates:
+    """Closed-day zone kWh of every tariff, for cost queries over arbitrary ranges.
+
+    Whole days come from this cache or from the period windows' per-day buckets; the
+    recorder is only read for partial edge days and for days no window has covered, in one
+    executor job, and the closed days it returns are kept for the next query. All tariffs
+    are evaluated here regardless of the refresh plan.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        *,
+        total_entity_id: str,
+        tariffs: list[CompiledTariff],
+        windows: dict[str, _PeriodWindow],
+        baselines: _BoundaryBaselines,
+        stats: dict[str, int],
+    ) -> None:
+        self.hass = hass
+        self.total_entity_id = total_entity_id
+        self._tariffs = tariffs
+        self._evaluator = MultiTariffEvaluator(tariffs)
+        self._windows = windows
+        self._baselines = baselines
+        self._stats = stats
+        self._days: dict[date, dict[str, tuple[float, ...]]] = {}
+
+    def absorb(self, start_local: datetime, end_local: datetime, result: WindowEvaluation) -> None:
+        """Keep a closing window's days, before its period window moves past them."""
+        if result.points < 2 or any(t.key not in result.per_day for t in self._tariffs):
+            return
+        day = start_local.date()
+        while day < end_local.date():
+            self._days[day] = {
+                t.key: result.per_day[t.key].get(day) or (0.0,) * len(t.zones) for t in self._tariffs
+            }
+            day += timedelta(days=1)
+
+    def _from_windows(self, day: date, today: date) -> dict[str, tuple[float, ...]] | None:
+        keys = [t.key for t in self._tariffs]
+        for w in self._windows.values():
+            result = w.result
+            # A day without a bucket used nothing only if the window read past it.
+            if (
+                result is None
+                or result.points < 2
+                or result.last_ts is None
+                or not w.start_local.date() <= day <= min(w.last_day, dt_util.as_local(result.last_ts).date())
+                or day >= today
+                or any(k not in result.per_day for k in keys)
+            ):
+                continue
+            return {
+                t.key: result.per_day[t.key].get(day) or (0.0,) * len(t.zones) for t in self._tariffs
+            }
+        return None
+
+    async def async_query(self, start_local: datetime, end_local: datetime) -> dict[str, Any]:
+        started = time.perf_counter()
+        tz = dt_util.DEFAULT_TIME_ZONE
+        now_local = dt_util.now()
+        today = now_local.date()
+        end_local = min(end_local, now_local)
+
+        def _midnight(d: date) -> datetime:
+            return datetime.combine(d, datetime.min.time(), tzinfo=tz)
+
+        # Whole days are [first_day, last_day); the rest are partial edge spans.
+        first_day = start_local.date()
+        if start_local > _midnight(first_day):
+            first_day += timedelta(days=1)
+        last_day = min(end_local.date(), today)
+        edges: list[tuple[datetime, datetime]] = []
+        if first_day >= last_day:
+            edges.append((start_local, end_local))
+        else:
+            if start_local < _midnight(first_day):
+                edges.append((start_local, _midnight(first_day)))
+            if _midnight(last_day) < end_local:
+                edges.append((_midnight(last_day), end_local))
+
+        per_day: dict[str, dict[date, tuple[float, ...]]] = {t.key: {} for t in self._tariffs}
+        # Today so far is exactly what the today window holds.
+        today_window = self._windows.get("today")
+        if (
+            edges
+            and edges[-1] == (_midnight(today), now_local)
+            and today_window is not None
+            and today_window.result is not None
+            and all(t.key in today_window.result.per_day for t in self._tariffs)
+        ):
+            edges.pop()
+            for t in self._tariffs:
+                zones = today_window.result.per_day[t.key].get(today)
+                if zones is not None:
+                    per_day[t.key][today] = zones
+
+        cached = 0
+        runs: list[tuple[datetime, datetime]] = []
+        d = first_day
+        while d < last_day:
+            buckets = self._days.get(d) or self._from_windows(d, today)
+            if buckets is not None:
+                self._days[d] = buckets
+                for key, zones in buckets.items():
+                    per_day[key][d] = zones
+                cached += 1
+            elif runs and runs[-1][1] == _midnight(d):
+                runs[-1] = (runs[-1][0], _midnight(d + timedelta(days=1)))
+            else:
+                runs.append((_midnight(d), _midnight(d + timedelta(days=1))))
+            d += timedelta(days=1)
+
+        spans = edges + runs
+        hass = self.hass
+        entity_id = self.total_entity_id
+        evaluator = self._evaluator
+        baselines = self._baselines
+
+        def _job() -> list[WindowEvaluation]:
+            results = []
+            for span_start, span_end in spans:
+                start_utc, end_utc = dt_util.as_utc(span_start), dt_util.as_utc(span_end)
+                points = _history_points(hass, entity_id, start_utc, end_utc)
+                points = anchor_at_boundary(points, start_utc, baselines.get(hass, entity_id, start_utc, "states"))
+                if len(points) >= 2:
+                    # Same gap handling as the period windows.
+                    points, _filled = _fill_from_statistics(
+                        hass,
+                        entity_id,
+                        points,
+                        start_utc,
+                        end_utc,
+                        baselines,
+                        lambda until: _lts_hourly_points(hass, entity_id, start_utc, until),
+                    )
+                else:
+                    points = _lts_hourly_points(hass, entity_id, start_utc, end_utc)
+                    points = anchor_at_boundary(
+                        points, start_utc, baselines.get(hass, entity_id, start_utc, "statistics")
+                    )
+                results.append(evaluator.evaluate(points, tz))
+            return results
+
+        fetched = await _recorder(hass).async_add_executor_job(_job) if spans else []
+
+        for (span_start, span_end), result in zip(spans, fetched):
+            for t in self._tariffs:
+                days = per_day[t.key]
+                for day, zones in result.per_day[t.key].items():
+                    prev = days.get(day)
+                    days[day] = zones if prev is None else tuple(a + b for a, b in zip(prev, zones))
+            # Closed whole days are kept for the next query.
+            if (span_start, span_end) in runs:
+                day = span_start.date()
+                while _midnight(day) < span_end:
+                    self._days[day] = {
+                        t.key: result.per_day[t.key].get(day) or (0.0,) * len(t.zones) for t in self._tariffs
+                    }
+                    day += timedelta(days=1)
+
+        tariffs: dict[str, Any] = {}
+        for t in self._tariffs:
+            days = per_day[t.key]
+            zones_kwh = [sum(zones[i] for zones in days.values()) for i in range(len(t.zones))]
+            tariffs[t.key] = {
+                "zones_kwh": {zone: round(kwh, 4) for zone, kwh in zip(t.zones, zones_kwh)},
+                "kwh": round(sum(zones_kwh), 4),
+                "cost_pln": round(t.cost(days), 4),
+            }
+
+        self._stats["range_queries"] = self._stats.get("range_queries", 0) + 1
+        return {
+            "start": start_local.isoformat(),
+            "end": end_local.isoformat(),
+            "days_cached": cached,
+            "days_fetched": sum((b.date() - a.date()).days for a, b in runs),
+            "edge_hours": round(sum((b - a).total_seconds() for a, b in edges) / 3600, 2),
+            "tariffs": tariffs,
+            "cheapest_tariff": min(tariffs, key=lambda k: tariffs[k]["cost_pln"]) if tariffs else None,
+            "query_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
 
 
 class _EntryBackedSensor(SensorEntity):
@@ -249,7 +981,7 @@ class _EntryBackedSensor(SensorEntity):
         self._attr_unique_id = f"{entry.entry_id}_{unique_suffix}"
 
     def _read(self, key: str, default: Any) -> Any:
-        return _get_entry_value(self._entry, key, default)
+        return get_entry_value(self._entry, key, default)
 
 
 class _RateConfigSensor(_EntryBackedSensor):
@@ -327,16 +1059,41 @@ class G12nScheduleSummarySensor(_EntryBackedSensor):
         )
 
 
+class G13ScheduleSummarySensor(_EntryBackedSensor):
+    _attr_icon = "mdi:calendar-clock"
+
+    def __init__(self, entry: ConfigEntry) -> None:
+        super().__init__(entry, unique_suffix="g13_schedule_summary", name="G13 schedule summary")
+
+    @property
+    def native_value(self) -> str:
+        morning_start = self._read(CONF_G13_MORNING_PEAK_START, DEFAULT_G13_MORNING_PEAK_START)
+        morning_end = self._read(CONF_G13_MORNING_PEAK_END, DEFAULT_G13_MORNING_PEAK_END)
+        summer_start = self._read(CONF_G13_AFTERNOON_PEAK_SUMMER_START, DEFAULT_G13_AFTERNOON_PEAK_SUMMER_START)
+        summer_end = self._read(CONF_G13_AFTERNOON_PEAK_SUMMER_END, DEFAULT_G13_AFTERNOON_PEAK_SUMMER_END)
+        winter_start = self._read(CONF_G13_AFTERNOON_PEAK_WINTER_START, DEFAULT_G13_AFTERNOON_PEAK_WINTER_START)
+        winter_end = self._read(CONF_G13_AFTERNOON_PEAK_WINTER_END, DEFAULT_G13_AFTERNOON_PEAK_WINTER_END)
+        return (
+            "Weekends: Off-peak 00:00–24:00. "
+            f"Summer (Apr–Sep, Mon–Fri): Morning peak {morning_start}–{morning_end}, "
+            f"Afternoon peak {summer_start}–{summer_end}; Off-peak otherwise. "
+            f"Winter (Oct–Mar, Mon–Fri): Morning peak {morning_start}–{morning_end}, "
+            f"Afternoon peak {winter_start}–{winter_end}; Off-peak otherwise."
+        )
+
+
 class G11PricePlnPerKwhSensor(SensorEntity):
     _attr_name = "Current RCE price (PLN/kWh)"
-    _attr_unique_id = "current_rce_price_pln_kwh"
+    _unrecorded_attributes = frozenset({"source_entity", "source_unit_expected", "conversion"})
     _attr_native_unit_of_measurement = "PLN/kWh"
     _attr_icon = "mdi:cash"
     _attr_should_poll = False
 
-    def __init__(self, hass: HomeAssistant, source_entity_id: str) -> None:
+    def __init__(self, hass: HomeAssistant, source_entity_id: str, *, entry_id: str) -> None:
         self.hass = hass
         self._source = source_entity_id
+        # Entries created before several were allowed are migrated in __init__.
+        self._attr_unique_id = f"{entry_id}_{PRICE_SENSOR_UNIQUE_ID}"
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
@@ -351,364 +1108,534 @@ class G11PricePlnPerKwhSensor(SensorEntity):
         st = self.hass.states.get(self._source)
         if not st:
             return None
-        raw = _as_float(st.state)
+        raw = as_float(st.state)
         if raw is None:
             return None
         return raw / 1000.0
 
 
-class G11CostTodayFromTotalSensor(SensorEntity):
-    _attr_name = "G11 - Net Cost Today"
-    _attr_native_unit_of_measurement = "PLN"
-    _attr_icon = "mdi:cash-sync"
+class _RenderedSensor(SensorEntity):
+    """Renders into _value/_attrs in async_update; refresh cycles write only what changed."""
+
     _attr_should_poll = False
+    # Fixed for the lifetime of the entity (a config change reloads it), so not recorded.
+    _unrecorded_attributes = frozenset(
+        {"total_energy_entity", "time_ranges", "formula", "season_rule", "week_start", "profile_weeks"}
+    )
 
-    def __init__(self, hass: HomeAssistant, entry_id: str, total_entity_id: str, g11_rate_pln_per_kwh: float) -> None:
-        self.hass = hass
-        self._total = total_entity_id
-        self._rate = g11_rate_pln_per_kwh
-        self._attr_unique_id = f"{entry_id}_g11_net_cost_today"
-        self._value: float | None = None
+    def __init__(self) -> None:
+        self._value: Any = None
         self._attrs: dict[str, Any] = {}
+        self._written: tuple[Any, dict[str, Any]] | None = None
 
     @property
-    def native_value(self) -> float | None:
+    def native_value(self) -> Any:
         return self._value
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         return self._attrs
 
-    async def async_update(self) -> None:
-        now_local = dt_util.now()
-        start_local = now_local.replace(hour=0, minute=0, second=0, microsecond=0)
-        start_utc = dt_util.as_utc(start_local)
-        end_utc = dt_util.as_utc(now_local)
+    def _snapshot(self) -> tuple[Any, dict[str, Any]]:
+        return self._value, {k: v for k, v in self._attrs.items() if k not in self._unrecorded_attributes}
 
-        points = await _fetch_history_states(self.hass, self._total, start_utc, end_utc)
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        # The platform writes the state rendered by update_before_add right after this.
+        self._written = self._snapshot()
 
-        st_now = self.hass.states.get(self._total)
-        live_now = _as_float(st_now.state) if st_now else None
-        now_source = "live_state"
-        if live_now is not None and points:
-            points = points[:-1] + [(end_utc, live_now)]
-        elif live_now is None:
-            now_source = "recorder_last_point"
+    @callback
+    def async_write_if_changed(self) -> bool:
+        snapshot = self._snapshot()
+        if snapshot == self._written:
+            return False
+        self._written = snapshot
+        self.async_write_ha_state()
+        return True
 
-        if len(points) < 2:
-            self._value = None
-            self._attrs = {
-                "total_energy_entity": self._total,
-                "rate_pln_per_kwh": _fmt_rate(self._rate),
-                "start_local": start_local.isoformat(),
-                "reason": "not_enough_points",
-                "points": len(points),
-            }
-            return
 
-        baseline = points[0][1]
-        now = points[-1][1]
-        delta = now - baseline
-        if delta < 0:
+class G11CostTodayFromTotalSensor(_RenderedSensor):
+    _attr_native_unit_of_measurement = "PLN"
+    _attr_icon = "mdi:cash-sync"
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        *,
+        entry_id: str,
+        window: _PeriodWindow,
+        tariff: CompiledTariff,
+        name: str,
+        unique_suffix: str,
+    ) -> None:
+        super().__init__()
+        self.hass = hass
+        self._window = window
+        self._tariff = tariff
+        self._attr_name = name
+        self._attr_unique_id = f"{entry_id}_{unique_suffix}"
+
+    async def async_update(self) -> None:
+        w = self._window
+        result = w.result
+        rate = self._tariff.rates_on(w.last_day)[0]
+        base = {
+            "total_energy_entity": w.total_entity_id,
+            "rate_pln_per_kwh": fmt_rate(rate),
+            "start_local": w.start_local.isoformat(),
+        }
+        points = result.points if result is not None else 0
+
+        if result is None or points < 2:
             self._value = None
-            self._attrs = {
-                "total_energy_entity": self._total,
-                "rate_pln_per_kwh": _fmt_rate(self._rate),
-                "start_local": start_local.isoformat(),
-                "reason": "negative_delta",
-                "points": len(points),
-            }
+            self._attrs = {**base, "reason": "not_enough_points", "points": points}
             return
 
-        self._value = round(delta * self._rate, 4)
+        # Summed per monotonic segment, so a meter reset does not make the day negative.
+        delta = result.totals[self._tariff.key][0]
+        self._value = round(delta * rate, 4)
         self._attrs = {
-            "total_energy_entity": self._total,
-            "rate_pln_per_kwh": _fmt_rate(self._rate),
+            **base,
             "formula": "cost_today = (total_now - total_at_midnight) * rate",
-            "start_local": start_local.isoformat(),
-            "baseline_total_kwh": round(baseline, 4),
-            "now_total_kwh": round(now, 4),
+            "baseline_total_kwh": round(result.first_value, 4),
+            "now_total_kwh": round(result.last_value, 4),
             "kwh_today": round(delta, 4),
-            "now_source": now_source,
-            "resolution": "history",
-            "points": len(points),
+            "now_source": w.now_source,
+            "resolution": w.resolution,
+            "points": points,
         }
+        if result.resets:
+            self._attrs["meter_resets"] = len(result.resets)
 
 
-class _TariffCostTodayFromTotalSensor(SensorEntity):
+class G11PeriodCostFromTotalSensor(_RenderedSensor):
     _attr_native_unit_of_measurement = "PLN"
     _attr_icon = "mdi:cash-clock"
-    _attr_should_poll = False
 
     def __init__(
         self,
         hass: HomeAssistant,
         *,
         entry_id: str,
-        total_entity_id: str,
+        window: _PeriodWindow,
+        tariff: CompiledTariff,
         name: str,
         unique_suffix: str,
-        day_rate: float,
-        night_rate: float,
-        time_ranges_attr: dict[str, Any],
-        season_rule: str,
-        is_day_fn: Callable[[datetime], bool],
     ) -> None:
+        super().__init__()
         self.hass = hass
-        self._total = total_entity_id
-        self._day_rate = day_rate
-        self._night_rate = night_rate
-        self._ranges_attr = time_ranges_attr
-        self._season_rule = season_rule
-        self._is_day_fn = is_day_fn
-
+        self._window = window
+        self._tariff = tariff
         self._attr_name = name
         self._attr_unique_id = f"{entry_id}_{unique_suffix}"
-        self._value: float | None = None
-        self._attrs: dict[str, Any] = {}
 
-    @property
-    def native_value(self) -> float | None:
-        return self._value
+    async def async_update(self) -> None:
+        w = self._window
+        result = w.result
+        rate = self._tariff.rates_on(w.last_day)[0]
+        base = {
+            "total_energy_entity": w.total_entity_id,
+            "period": w.period,
+            "rate_pln_per_kwh": fmt_rate(rate),
+            "start_local": w.start_local.isoformat(),
+            "end_local": w.end_local.isoformat(),
+            "resolution": w.resolution,
+            "coverage": w.coverage,
+        }
+        points = result.points if result is not None else 0
 
-    @property
-    def extra_state_attributes(self) -> dict[str, Any]:
-        return self._attrs
+        if result is None or points < 2:
+            self._value = None
+            self._attrs = {**base, "reason": "not_enough_points", "points": points}
+            return
 
-    async def async_update(self) -> None:
-        now_local = dt_util.now()
-        tz = dt_util.DEFAULT_TIME_ZONE
-        start_local = now_local.replace(hour=0, minute=0, second=0, microsecond=0)
+        # Summed per monotonic segment, so a meter reset does not make the period negative.
+        delta = result.totals[self._tariff.key][0]
+        self._value = round(delta * rate, 4)
+        self._attrs = {
+            **base,
+            "formula": "cost_period = (total_end - total_start) * rate",
+            "baseline_total_kwh": round(result.first_value, 4),
+            "end_total_kwh": round(result.last_value, 4),
+            "kwh": round(delta, 4),
+            "points": points,
+            "week_start": "monday" if w.period == "week" else None,
+        }
+        if result.resets:
+            self._attrs["meter_resets"] = len(result.resets)
+        # Rates changed inside the period: price each day at its own rate instead.
+        changes = self._tariff.rate_changes_between(w.start_local.date(), w.last_day)
+        if changes:
+            self._value = round(self._tariff.cost(result.per_day[self._tariff.key]), 4)
+            self._attrs["rate_changes_in_period"] = changes
 
-        start_utc = dt_util.as_utc(start_local)
-        end_utc = dt_util.as_utc(now_local)
 
-        resolution = "history"
-        points = await _fetch_history_states(self.hass, self._total, start_utc, end_utc)
-        if len(points) < 2:
-            resolution = "long_term_statistics"
-            points = await _fetch_lts_hourly_totals(self.hass, self._total, start_utc, end_utc)
+class _TariffPeriodCostFromTotalSensor(_RenderedSensor):
+    """Zoned tariff cost for one period, rendered from the period's shared window."""
+
+    _attr_native_unit_of_measurement = "PLN"
+    _attr_icon = "mdi:cash-clock"
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        *,
+        entry_id: str,
+        window: _PeriodWindow,
+        tariff: CompiledTariff,
+        name: str,
+        unique_suffix: str,
+    ) -> None:
+        super().__init__()
+        self.hass = hass
+        self._window = window
+        self._tariff = tariff
+        self._attr_name = name
+        self._attr_unique_id = f"{entry_id}_{unique_suffix}"
+
+    def _window_attrs(self) -> dict[str, Any]:
+        w = self._window
+        return {
+            "total_energy_entity": w.total_entity_id,
+            "period": w.period,
+            "start_local": w.start_local.isoformat(),
+            "end_local": w.end_local.isoformat(),
+            "resolution": w.resolution,
+            "coverage": w.coverage,
+        }
+
+    def _extra_attrs(self) -> dict[str, Any]:
+        return {"week_start": "monday" if self._window.period == "week" else None}
+
+    async def async_update(self) -> None:
+        result = self._window.result
+        points = result.points if result is not None else 0
 
-        if len(points) < 2:
+        if result is None or points < 2:
             self._value = None
-            self._attrs = {
-                "total_energy_entity": self._total,
-                "start_local": start_local.isoformat(),
-                "resolution": resolution,
-                "reason": "not_enough_points",
-                "points": len(points),
-            }
+            self._attrs = {**self._window_attrs(), "reason": "not_enough_points", "points": points}
             return
 
-        if resolution == "history":
-            st_now = self.hass.states.get(self._total)
-            live_now = _as_float(st_now.state) if st_now else None
-            if live_now is not None:
-                points = points[:-1] + [(end_utc, live_now)]
-
-        day_kwh, night_kwh = _sum_deltas_by_tariff(points, tz, self._is_day_fn)
-        cost = day_kwh * self._day_rate + night_kwh * self._night_rate
+        tariff = self._tariff
+        w = self._window
+        zones_kwh = result.totals[tariff.key]
+        rates = tariff.rates_on(w.last_day)
+        # Rates changed inside the period: price each day at its own rates in one sweep.
+        changes = tariff.rate_changes_between(w.start_local.date(), w.last_day)
+        if changes:
+            cost = tariff.cost(result.per_day[tariff.key])
+        else:
+            cost = zone_cost(zones_kwh, rates)
+
+        # One "<zone>_kwh" / "<zone>_rate_pln_per_kwh" pair per zone, in zone order.
+        zone_attrs: dict[str, Any] = {}
+        for zone, kwh in zip(tariff.zones, zones_kwh):
+            zone_attrs[f"{zone}_kwh"] = round(kwh, 4)
+        for zone, rate in zip(tariff.zones, rates):
+            zone_attrs[f"{zone}_rate_pln_per_kwh"] = fmt_rate(rate)
+        if changes:
+            zone_attrs["rate_changes_in_period"] = changes
 
         self._value = round(cost, 4)
         self._attrs = {
-            "total_energy_entity": self._total,
-            "start_local": start_local.isoformat(),
-            "resolution": resolution,
-            "day_kwh": round(day_kwh, 4),
-            "night_kwh": round(night_kwh, 4),
-            "day_rate_pln_per_kwh": _fmt_rate(self._day_rate),
-            "night_rate_pln_per_kwh": _fmt_rate(self._night_rate),
-            "time_ranges": self._ranges_attr,
-            "formula": "cost = day_kwh*day_rate + night_kwh*night_rate",
-            "season_rule": self._season_rule,
-            "points": len(points),
+            **self._window_attrs(),
+            **zone_attrs,
+            "time_ranges": tariff.definition.time_ranges,
+            "formula": "cost = " + " + ".join(f"{zone}_kwh*{zone}_rate" for zone in tariff.zones),
+            "season_rule": tariff.definition.season_rule,
+            "points": points,
+            **self._extra_attrs(),
         }
 
 
-class _TariffPeriodCostFromTotalSensor(SensorEntity):
-    _attr_native_unit_of_measurement = "PLN"
+class _TariffCostTodayFromTotalSensor(_TariffPeriodCostFromTotalSensor):
     _attr_icon = "mdi:cash-clock"
-    _attr_should_poll = False
+
+    def _window_attrs(self) -> dict[str, Any]:
+        w = self._window
+        return {
+            "total_energy_entity": w.total_entity_id,
+            "start_local": w.start_local.isoformat(),
+            "resolution": w.resolution,
+        }
+
+    def _extra_attrs(self) -> dict[str, Any]:
+        return {}
+
+
+class _TariffZoneEnergyTodaySensor(_RenderedSensor):
+    """kWh used today in one zone of one tariff, from the same buckets the cost sensors price.
+
+    Resets at midnight; as a total_increasing sensor the recorder's long-term statistics
+    give the monthly and yearly per-zone sums.
+    """
+
+    _attr_native_unit_of_measurement = "kWh"
+    _attr_device_class = SensorDeviceClass.ENERGY
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_icon = "mdi:lightning-bolt"
+    _unrecorded_attributes = _RenderedSensor._unrecorded_attributes | {"tariff", "zone"}
 
     def __init__(
         self,
         hass: HomeAssistant,
         *,
         entry_id: str,
-        total_entity_id: str,
-        period: str,
+        window: _PeriodWindow,
+        tariff: CompiledTariff,
+        zone: int,
         name: str,
         unique_suffix: str,
-        day_rate: float,
-        night_rate: float,
-        time_ranges_attr: dict[str, Any],
-        season_rule: str,
-        is_day_fn: Callable[[datetime], bool],
     ) -> None:
+        super().__init__()
         self.hass = hass
-        self._total = total_entity_id
-        self._period = period
-        self._day_rate = day_rate
-        self._night_rate = night_rate
-        self._ranges_attr = time_ranges_attr
-        self._season_rule = season_rule
-        self._is_day_fn = is_day_fn
-
+        self._window = window
+        self._tariff = tariff
+        self._zone = zone
         self._attr_name = name
         self._attr_unique_id = f"{entry_id}_{unique_suffix}"
-        self._value: float | None = None
-        self._attrs: dict[str, Any] = {}
 
-    @property
-    def native_value(self) -> float | None:
-        return self._value
+    async def async_update(self) -> None:
+        w = self._window
+        result = w.result
+        points = result.points if result is not None else 0
+        base = {
+            "total_energy_entity": w.total_entity_id,
+            "tariff": self._tariff.key,
+            "zone": self._tariff.zones[self._zone],
+            "start_local": w.start_local.isoformat(),
+        }
 
-    @property
-    def extra_state_attributes(self) -> dict[str, Any]:
-        return self._attrs
+        if result is None or points < 2:
+            self._value = None
+            self._attrs = {**base, "reason": "not_enough_points", "points": points}
+            return
+
+        self._value = round(result.totals[self._tariff.key][self._zone], 4)
+        self._attrs = base
+
+
+class _TariffProjectedCostSensor(_RenderedSensor):
+    """Projected cost at the end of the month/year, from cached daily rollups only."""
+
+    _attr_native_unit_of_measurement = "PLN"
+    _attr_icon = "mdi:chart-timeline-variant"
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        *,
+        entry_id: str,
+        tariff: CompiledTariff,
+        rollup: DailyZoneRollup,
+        horizon: str,
+        name: str,
+        unique_suffix: str,
+    ) -> None:
+        super().__init__()
+        self.hass = hass
+        self._tariff = tariff
+        self._rollup = rollup
+        self._horizon = horizon
+
+        self._attr_name = name
+        self._attr_unique_id = f"{entry_id}_{unique_suffix}"
 
     async def async_update(self) -> None:
-        now_local = dt_util.now()
-        tz = dt_util.DEFAULT_TIME_ZONE
-        start_local, end_local = _period_range_local(now_local, self._period)
+        tariff = self._tariff
+        key = tariff.key
+        zones = tariff.zones
+        n = len(zones)
 
-        start_utc = dt_util.as_utc(start_local)
-        end_utc = dt_util.as_utc(end_local)
+        now_local = dt_util.now()
+        today = now_local.date()
+        start_local, _ = period_range_local(now_local, self._horizon)
+        start = start_local.date()
+        if self._horizon == "month":
+            next_start = (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+        else:
+            next_start = start.replace(year=start.year + 1)
+
+        # Per-day vectors, so each day is priced at the rates in effect on it.
+        actual_days: dict[date, tuple[float, ...]] = {}
+        days_missing = 0
+        d = start
+        while d < today:
+            b = self._rollup.get(key, d)
+            if b is None:
+                days_missing += 1
+            else:
+                actual_days[d] = b
+            d += timedelta(days=1)
 
-        resolution = "history"
-        points = await _fetch_history_states(self.hass, self._total, start_utc, end_utc)
-        if len(points) < 2:
-            resolution = "long_term_statistics"
-            points = await _fetch_lts_hourly_totals(self.hass, self._total, start_utc, end_utc)
+        today_b = self._rollup.get(key, today) or (0.0,) * n
+        actual_days[today] = today_b
+        actual = [sum(zone) for zone in zip(*actual_days.values())]
 
-        if len(points) < 2:
+        profiles = {
+            wd: self._rollup.weekday_profile(key, wd, today, PROJECTION_PROFILE_WEEKS)
+            for wd in range(7)
+        }
+        if all(p is None for p in profiles.values()):
             self._value = None
             self._attrs = {
-                "total_energy_entity": self._total,
-                "period": self._period,
-                "start_local": start_local.isoformat(),
-                "end_local": end_local.isoformat(),
-                "resolution": resolution,
-                "reason": "not_enough_points",
-                "points": len(points),
+                "tariff": key,
+                "horizon": self._horizon,
+                "reason": "no_profile",
+                "profile_weeks": PROJECTION_PROFILE_WEEKS,
             }
             return
 
-        day_kwh, night_kwh = _sum_deltas_by_tariff(points, tz, self._is_day_fn)
-        cost = day_kwh * self._day_rate + night_kwh * self._night_rate
+        known = [p for p in profiles.values() if p is not None]
+        fallback = tuple(sum(zone) / len(known) for zone in zip(*known))
+
+        p_today = profiles[today.weekday()] or fallback
+        projected_days = {today: tuple(max(p_today[i] - today_b[i], 0.0) for i in range(n))}
+
+        d = today + timedelta(days=1)
+        while d < next_start:
+            projected_days[d] = profiles[d.weekday()] or fallback
+            d += timedelta(days=1)
+        days_remaining = len(projected_days) - 1
+        rest = [sum(zone) for zone in zip(*projected_days.values())]
+
+        actual_cost = tariff.cost(actual_days)
+        cost = actual_cost + tariff.cost(projected_days)
+        rates = tariff.rates_on(today)
 
         self._value = round(cost, 4)
         self._attrs = {
-            "total_energy_entity": self._total,
-            "period": self._period,
+            "tariff": key,
+            "horizon": self._horizon,
             "start_local": start_local.isoformat(),
-            "end_local": end_local.isoformat(),
-            "resolution": resolution,
-            "day_kwh": round(day_kwh, 4),
-            "night_kwh": round(night_kwh, 4),
-            "day_rate_pln_per_kwh": _fmt_rate(self._day_rate),
-            "night_rate_pln_per_kwh": _fmt_rate(self._night_rate),
-            "time_ranges": self._ranges_attr,
-            "formula": "cost = day_kwh*day_rate + night_kwh*night_rate",
-            "season_rule": self._season_rule,
-            "points": len(points),
-            "week_start": "monday" if self._period == "week" else None,
+            **{f"actual_{zone}_kwh": round(kwh, 4) for zone, kwh in zip(zones, actual)},
+            **{f"projected_remaining_{zone}_kwh": round(kwh, 4) for zone, kwh in zip(zones, rest)},
+            "actual_cost": round(actual_cost, 4),
+            "days_remaining": days_remaining,
+            "days_missing": days_missing,
+            "profile_weeks": PROJECTION_PROFILE_WEEKS,
+            **{f"{zone}_rate_pln_per_kwh": fmt_rate(rate) for zone, rate in zip(zones, rates)},
+            "formula": "cost = (actual_kwh + same_weekday_profile_kwh * remaining_days) * rate per zone",
         }
 
 
-class G11PeriodCostFromTotalSensor(SensorEntity):
-    _attr_native_unit_of_measurement = "PLN"
-    _attr_icon = "mdi:cash-clock"
-    _attr_should_poll = False
+class _TariffComparisonSensor(_RenderedSensor):
+    """Base for per-period comparisons over the cost sensors' own results (no extra fetches)."""
 
     def __init__(
         self,
         hass: HomeAssistant,
         *,
         entry_id: str,
-        total_entity_id: str,
-        g11_rate_pln_per_kwh: float,
         period: str,
         name: str,
         unique_suffix: str,
+        cost_sensors: dict[str, SensorEntity],
+        current_tariff: str,
     ) -> None:
+        super().__init__()
         self.hass = hass
-        self._total = total_entity_id
-        self._rate = g11_rate_pln_per_kwh
         self._period = period
+        self._cost_sensors = cost_sensors
+        self._current = current_tariff
+
         self._attr_name = name
         self._attr_unique_id = f"{entry_id}_{unique_suffix}"
 
-        self._value: float | None = None
-        self._attrs: dict[str, Any] = {}
+    def _compare(self) -> tuple[dict[str, float], str | None, float | None]:
+        costs = {
+            tariff: float(s.native_value)
+            for tariff, s in self._cost_sensors.items()
+            if s.native_value is not None
+        }
+        cheapest = min(costs, key=costs.get) if costs else None
+        current_cost = costs.get(self._current)
+        savings = None
+        if cheapest is not None and current_cost is not None:
+            savings = current_cost - costs[cheapest]
+        return costs, cheapest, savings
+
+    def _base_attrs(self, costs: dict[str, float]) -> dict[str, Any]:
+        current_cost = costs.get(self._current)
+        return {
+            "period": self._period,
+            "current_tariff": self._current,
+            "costs_pln": {t: round(c, 4) for t, c in costs.items()},
+            "savings_vs_current_pln": (
+                {t: round(current_cost - c, 4) for t, c in costs.items()}
+                if current_cost is not None
+                else None
+            ),
+        }
 
-    @property
-    def native_value(self) -> float | None:
-        return self._value
 
-    @property
-    def extra_state_attributes(self) -> dict[str, Any]:
-        return self._attrs
+class _CheapestTariffSensor(_TariffComparisonSensor):
+    _attr_icon = "mdi:trophy-outline"
 
     async def async_update(self) -> None:
-        now_local = dt_util.now()
-        start_local, end_local = _period_range_local(now_local, self._period)
+        costs, cheapest, _ = self._compare()
+        self._value = cheapest
+        self._attrs = self._base_attrs(costs)
+        if cheapest is None:
+            self._attrs["reason"] = "no_costs"
 
-        start_utc = dt_util.as_utc(start_local)
-        end_utc = dt_util.as_utc(end_local)
 
-        resolution = "history"
-        points = await _fetch_history_states(self.hass, self._total, start_utc, end_utc)
-        if len(points) < 2:
-            resolution = "long_term_statistics"
-            points = await _fetch_lts_hourly_totals(self.hass, self._total, start_utc, end_utc)
+class _TariffSavingsSensor(_TariffComparisonSensor):
+    _attr_native_unit_of_measurement = "PLN"
+    _attr_icon = "mdi:piggy-bank-outline"
 
-        if len(points) < 2:
-            self._value = None
-            self._attrs = {
-                "total_energy_entity": self._total,
-                "period": self._period,
-                "rate_pln_per_kwh": _fmt_rate(self._rate),
-                "start_local": start_local.isoformat(),
-                "end_local": end_local.isoformat(),
-                "resolution": resolution,
-                "reason": "not_enough_points",
-                "points": len(points),
-            }
-            return
+    async def async_update(self) -> None:
+        costs, cheapest, savings = self._compare()
+        self._value = round(savings, 4) if savings is not None else None
+        self._attrs = self._base_attrs(costs)
+        self._attrs["cheapest_tariff"] = cheapest
+        self._attrs["formula"] = "savings = cost(current_tariff) - cost(cheapest_tariff)"
+        if savings is None:
+            self._attrs["reason"] = "no_costs" if cheapest is None else "current_tariff_unavailable"
 
-        baseline = points[0][1]
-        now = points[-1][1]
-        delta = now - baseline
-        if delta < 0:
-            self._value = None
-            self._attrs = {
-                "total_energy_entity": self._total,
-                "period": self._period,
-                "rate_pln_per_kwh": _fmt_rate(self._rate),
-                "start_local": start_local.isoformat(),
-                "end_local": end_local.isoformat(),
-                "resolution": resolution,
-                "reason": "negative_delta",
-                "points": len(points),
-            }
-            return
 
-        self._value = round(delta * self._rate, 4)
+class _PeriodSummarySensor(_TariffComparisonSensor):
+    """Compact mode: the cheapest tariff, with every tariff's cost and kWh for the period.
+
+    Stands in for the period's cost and comparison sensors, which are still rendered
+    (not added) to price the window, so a refresh writes one state per period.
+    """
+
+    _attr_icon = "mdi:table-large"
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        *,
+        window: _PeriodWindow,
+        tariffs: list[CompiledTariff],
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(hass, **kwargs)
+        self._window = window
+        self._tariffs = tariffs
+
+    async def async_update(self) -> None:
+        costs, cheapest, savings = self._compare()
+        w = self._window
+        totals = w.result.totals if w.result is not None else {}
+        self._value = cheapest
         self._attrs = {
-            "total_energy_entity": self._total,
-            "period": self._period,
-            "rate_pln_per_kwh": _fmt_rate(self._rate),
-            "formula": "cost_period = (total_end - total_start) * rate",
-            "start_local": start_local.isoformat(),
-            "end_local": end_local.isoformat(),
-            "baseline_total_kwh": round(baseline, 4),
-            "end_total_kwh": round(now, 4),
-            "kwh": round(delta, 4),
-            "resolution": resolution,
-            "points": len(points),
-            "week_start": "monday" if self._period == "week" else None,
+            **self._base_attrs(costs),
+            "start_local": w.start_local.isoformat(),
+            "end_local": w.end_local.isoformat(),
+            "savings_pln": round(savings, 4) if savings is not None else None,
+            "kwh": {t.key: round(sum(totals[t.key]), 4) for t in self._tariffs if t.key in totals},
+            "zones_kwh": {
+                t.key: {zone: round(kwh, 4) for zone, kwh in zip(t.zones, totals[t.key])}
+                for t in self._tariffs
+                if t.key in totals and len(t.zones) > 1
+            },
+            "resolution": w.resolution,
+            "coverage": w.coverage,
         }
+        if cheapest is None:
+            self._attrs["reason"] = "no_costs"
 
 
 async def async_setup_entry(
@@ -716,259 +1643,388 @@ async def async_setup_entry(
     entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
-    price_entity = _get_entry_value(entry, CONF_PRICE_ENTITY, None)
-    total_energy_entity = _get_entry_value(entry, CONF_TOTAL_ENERGY_ENTITY, DEFAULT_TOTAL_ENERGY_ENTITY)
-
-    g11_rate = float(_get_entry_value(entry, CONF_G11_RATE, DEFAULT_G11_RATE))
-
-    g12_day_rate = float(_get_entry_value(entry, CONF_G12_DAY_RATE, DEFAULT_G12_DAY_RATE))
-    g12_night_rate = float(_get_entry_value(entry, CONF_G12_NIGHT_RATE, DEFAULT_G12_NIGHT_RATE))
-    g12w_day_rate = float(_get_entry_value(entry, CONF_G12W_DAY_RATE, DEFAULT_G12W_DAY_RATE))
-    g12w_night_rate = float(_get_entry_value(entry, CONF_G12W_NIGHT_RATE, DEFAULT_G12W_NIGHT_RATE))
-    g12n_day_rate = float(_get_entry_value(entry, CONF_G12N_DAY_RATE, DEFAULT_G12N_DAY_RATE))
-    g12n_night_rate = float(_get_entry_value(entry, CONF_G12N_NIGHT_RATE, DEFAULT_G12N_NIGHT_RATE))
-
-    g12_cfg = {
-        "day_range_1_start": _get_entry_value(entry, CONF_G12_DAY_RANGE_1_START, DEFAULT_G12_DAY_RANGE_1_START),
-        "day_range_2_summer_start": _get_entry_value(entry, CONF_G12_DAY_RANGE_2_SUMMER_START, DEFAULT_G12_DAY_RANGE_2_SUMMER_START),
-        "day_range_2_winter_start": _get_entry_value(entry, CONF_G12_DAY_RANGE_2_WINTER_START, DEFAULT_G12_DAY_RANGE_2_WINTER_START),
-        "night_range_1_summer_start": _get_entry_value(entry, CONF_G12_NIGHT_RANGE_1_SUMMER_START, DEFAULT_G12_NIGHT_RANGE_1_SUMMER_START),
-        "night_range_1_winter_start": _get_entry_value(entry, CONF_G12_NIGHT_RANGE_1_WINTER_START, DEFAULT_G12_NIGHT_RANGE_1_WINTER_START),
-        "night_range_2_start": _get_entry_value(entry, CONF_G12_NIGHT_RANGE_2_START, DEFAULT_G12_NIGHT_RANGE_2_START),
+    price_entity = get_entry_value(entry, CONF_PRICE_ENTITY, None)
+    total_energy_entity = get_entry_value(entry, CONF_TOTAL_ENERGY_ENTITY, DEFAULT_TOTAL_ENERGY_ENTITY)
+
+    current_tariff = get_entry_value(entry, CONF_CURRENT_TARIFF, DEFAULT_CURRENT_TARIFF)
+    sql_hourly = bool(get_entry_value(entry, CONF_SQL_HOURLY_AGGREGATION, DEFAULT_SQL_HOURLY_AGGREGATION))
+    compact = bool(get_entry_value(entry, CONF_COMPACT_MODE, DEFAULT_COMPACT_MODE))
+
+    compiled = compile_tariffs(build_tariff_definitions(entry))
+    evaluator = MultiTariffEvaluator(compiled)
+
+    rollup = DailyZoneRollup()
+    stats: dict[str, int] = {}
+    sources = _SourceTracker(hass, stats)
+    baselines = _BoundaryBaselines(stats)
+    # Created in __init__ before the platforms are forwarded.
+    series = hass.data[DOMAIN][DATA_SERIES_CACHE]
+    hass.data[DOMAIN][entry.entry_id] = {
+        "stats": stats,
+        "sources": sources,
+        "total_energy_entity": total_energy_entity,
+        "started": dt_util.utcnow(),
+        # Used by the export service.
+        "tariffs": compiled,
     }
-    g12w_cfg = {
-        "day_range_1_start": _get_entry_value(entry, CONF_G12W_DAY_RANGE_1_START, DEFAULT_G12W_DAY_RANGE_1_START),
-        "day_range_2_summer_start": _get_entry_value(entry, CONF_G12W_DAY_RANGE_2_SUMMER_START, DEFAULT_G12W_DAY_RANGE_2_SUMMER_START),
-        "day_range_2_winter_start": _get_entry_value(entry, CONF_G12W_DAY_RANGE_2_WINTER_START, DEFAULT_G12W_DAY_RANGE_2_WINTER_START),
-        "night_range_1_summer_start": _get_entry_value(entry, CONF_G12W_NIGHT_RANGE_1_SUMMER_START, DEFAULT_G12W_NIGHT_RANGE_1_SUMMER_START),
-        "night_range_1_winter_start": _get_entry_value(entry, CONF_G12W_NIGHT_RANGE_1_WINTER_START, DEFAULT_G12W_NIGHT_RANGE_1_WINTER_START),
-        "night_range_2_start": _get_entry_value(entry, CONF_G12W_NIGHT_RANGE_2_START, DEFAULT_G12W_NIGHT_RANGE_2_START),
-        "weekend_rule": "sat_sun_always_night",
+
+    period_labels = {
+        "today": ("Today", "today"),
+        "week": ("This Week", "this_week"),
+        "month": ("This Month", "this_month"),
+        "year": ("This Year", "this_year"),
+        "last_year": ("Last Year", "last_year"),
     }
-    g12n_cfg = {
-        "day_start": _get_entry_value(entry, CONF_G12N_DAY_START, DEFAULT_G12N_DAY_START),
-        "night_start": _get_entry_value(entry, CONF_G12N_NIGHT_START, DEFAULT_G12N_NIGHT_START),
-        "sunday_rule": "always_night",
+    # One shared window per period: a single fetch and a single pass over all tariffs.
+    windows = {
+        period: _PeriodWindow(
+            hass,
+            period=period,
+            total_entity_id=total_energy_entity,
+            evaluator=evaluator,
+            rollup=rollup,
+            sources=sources,
+            baselines=baselines,
+            series=series,
+            stats=stats,
+            sql_hourly=sql_hourly,
+        )
+        for period in period_labels
     }
-
-    # Today sensors
-    g11_today = G11CostTodayFromTotalSensor(hass, entry.entry_id, total_energy_entity, g11_rate)
-    g12_today = _TariffCostTodayFromTotalSensor(
-        hass,
-        entry_id=entry.entry_id,
-        total_entity_id=total_energy_entity,
-        name="G12 - Net Cost Today",
-        unique_suffix="g12_net_cost_today",
-        day_rate=g12_day_rate,
-        night_rate=g12_night_rate,
-        time_ranges_attr=g12_cfg,
-        season_rule="summer if DST else winter",
-        is_day_fn=lambda dt: _is_day_tariff_g12(dt, g12_cfg),
-    )
-    g12w_today = _TariffCostTodayFromTotalSensor(
+    # Used by the load profile and range cost services.
+    hass.data[DOMAIN][entry.entry_id]["windows"] = windows
+    days = hass.data[DOMAIN][entry.entry_id]["days"] = _DayAggregates(
         hass,
-        entry_id=entry.entry_id,
         total_entity_id=total_energy_entity,
-        name="G12w - Net Cost Today",
-        unique_suffix="g12w_net_cost_today",
-        day_rate=g12w_day_rate,
-        night_rate=g12w_night_rate,
-        time_ranges_attr=g12w_cfg,
-        season_rule="summer if DST else winter",
-        is_day_fn=lambda dt: _is_day_tariff_g12w(dt, g12w_cfg),
-    )
-    g12n_today = _TariffCostTodayFromTotalSensor(
-        hass,
-        entry_id=entry.entry_id,
-        total_entity_id=total_energy_entity,
-        name="G12n - Net Cost Today",
-        unique_suffix="g12n_net_cost_today",
-        day_rate=g12n_day_rate,
-        night_rate=g12n_night_rate,
-        time_ranges_attr=g12n_cfg,
-        season_rule="fixed (weekday rules; no DST)",
-        is_day_fn=lambda dt: _is_day_tariff_g12n(dt, g12n_cfg),
+        tariffs=compiled,
+        windows=windows,
+        baselines=baselines,
+        stats=stats,
     )
 
-    # G11 periods
-    g11_week = G11PeriodCostFromTotalSensor(
-        hass,
-        entry_id=entry.entry_id,
-        total_entity_id=total_energy_entity,
-        g11_rate_pln_per_kwh=g11_rate,
-        period="week",
-        name="G11 - Net Cost This Week",
-        unique_suffix="g11_net_cost_this_week",
-    )
-    g11_month = G11PeriodCostFromTotalSensor(
-        hass,
-        entry_id=entry.entry_id,
-        total_entity_id=total_energy_entity,
-        g11_rate_pln_per_kwh=g11_rate,
-        period="month",
-        name="G11 - Net Cost This Month",
-        unique_suffix="g11_net_cost_this_month",
-    )
-    g11_year = G11PeriodCostFromTotalSensor(
-        hass,
-        entry_id=entry.entry_id,
-        total_entity_id=total_energy_entity,
-        g11_rate_pln_per_kwh=g11_rate,
-        period="year",
-        name="G11 - Net Cost This Year",
-        unique_suffix="g11_net_cost_this_year",
-    )
-    g11_last_year = G11PeriodCostFromTotalSensor(
-        hass,
-        entry_id=entry.entry_id,
-        total_entity_id=total_energy_entity,
-        g11_rate_pln_per_kwh=g11_rate,
-        period="last_year",
-        name="G11 - Net Cost Last Year",
-        unique_suffix="g11_net_cost_last_year",
-    )
-
-    def _mk_periods(prefix: str, day_rate: float, night_rate: float, cfg: dict[str, Any], season_rule: str, is_day_fn: Callable[[datetime], bool]):
-        return (
-            _TariffPeriodCostFromTotalSensor(
-                hass,
-                entry_id=entry.entry_id,
-                total_entity_id=total_energy_entity,
-                period="week",
-                name=f"{prefix} - Net Cost This Week",
-                unique_suffix=f"{prefix.lower()}_net_cost_this_week",
-                day_rate=day_rate,
-                night_rate=night_rate,
-                time_ranges_attr=cfg,
-                season_rule=season_rule,
-                is_day_fn=is_day_fn,
-            ),
-            _TariffPeriodCostFromTotalSensor(
+    cost_sensors_by_period: dict[str, dict[str, SensorEntity]] = {period: {} for period in period_labels}
+    # Per rendered sensor: the windows it reads and the tariffs it needs evaluated.
+    needs: list[tuple[_RenderedSensor, frozenset[str], frozenset[str]]] = []
+    zone_energy: list[_TariffZoneEnergyTodaySensor] = []
+    projections: list[_TariffProjectedCostSensor] = []
+    for tariff in compiled:
+        flat = len(tariff.zones) == 1
+        for period, (label, suffix) in period_labels.items():
+            if flat:
+                cls = G11CostTodayFromTotalSensor if period == "today" else G11PeriodCostFromTotalSensor
+            else:
+                cls = _TariffCostTodayFromTotalSensor if period == "today" else _TariffPeriodCostFromTotalSensor
+            cost_sensors_by_period[period][tariff.key] = cls(
                 hass,
                 entry_id=entry.entry_id,
-                total_entity_id=total_energy_entity,
-                period="month",
-                name=f"{prefix} - Net Cost This Month",
-                unique_suffix=f"{prefix.lower()}_net_cost_this_month",
-                day_rate=day_rate,
-                night_rate=night_rate,
-                time_ranges_attr=cfg,
-                season_rule=season_rule,
-                is_day_fn=is_day_fn,
-            ),
-            _TariffPeriodCostFromTotalSensor(
+                window=windows[period],
+                tariff=tariff,
+                name=f"{tariff.key} - Net Cost {label}",
+                unique_suffix=f"{tariff.key.lower()}_net_cost_{suffix}",
+            )
+            if not compact:
+                needs.append((cost_sensors_by_period[period][tariff.key], frozenset({period}), frozenset({tariff.key})))
+
+        # Compact mode only renders the cost sensors, through the period summaries below.
+        if compact:
+            continue
+
+        # Per-zone kWh today (same buckets as the cost sensors; replaces utility_meter splits)
+        if not flat:
+            for zone_index, zone in enumerate(tariff.zones):
+                zone_energy.append(
+                    _TariffZoneEnergyTodaySensor(
+                        hass,
+                        entry_id=entry.entry_id,
+                        window=windows["today"],
+                        tariff=tariff,
+                        zone=zone_index,
+                        name=f"{tariff.key} - Energy Today {zone.replace('_', ' ').title()}",
+                        unique_suffix=f"{tariff.key.lower()}_{zone}_energy_today",
+                    )
+                )
+                needs.append((zone_energy[-1], frozenset({"today"}), frozenset({tariff.key})))
+
+        # Projections (from the daily rollup only; no recorder reads)
+        for horizon, label in (("month", "This Month"), ("year", "This Year")):
+            projections.append(
+                _TariffProjectedCostSensor(
+                    hass,
+                    entry_id=entry.entry_id,
+                    tariff=tariff,
+                    rollup=rollup,
+                    horizon=horizon,
+                    name=f"{tariff.key} - Projected Cost {label}",
+                    unique_suffix=f"{tariff.key.lower()}_projected_cost_this_{horizon}",
+                )
+            )
+            # Closed days of the month/year reach the rollup through those windows.
+            needs.append((projections[-1], frozenset({"today", "month", "year"}), frozenset({tariff.key})))
+
+    # Comparisons (read the cost sensors' results after each refresh)
+    comparisons: dict[str, list[_TariffComparisonSensor]] = {}
+    for period, cost_sensors in cost_sensors_by_period.items():
+        label, suffix = period_labels[period]
+        if compact:
+            comparisons[period] = [
+                _PeriodSummarySensor(
+                    hass,
+                    window=windows[period],
+                    tariffs=compiled,
+                    entry_id=entry.entry_id,
+                    period=period,
+                    name=f"Tariff Comparison {label}",
+                    unique_suffix=f"tariff_comparison_{suffix}",
+                    cost_sensors=cost_sensors,
+                    current_tariff=current_tariff,
+                )
+            ]
+            needs.append((comparisons[period][0], frozenset({period}), frozenset(cost_sensors)))
+            continue
+        comparisons[period] = [
+            _CheapestTariffSensor(
                 hass,
                 entry_id=entry.entry_id,
-                total_entity_id=total_energy_entity,
-                period="year",
-                name=f"{prefix} - Net Cost This Year",
-                unique_suffix=f"{prefix.lower()}_net_cost_this_year",
-                day_rate=day_rate,
-                night_rate=night_rate,
-                time_ranges_attr=cfg,
-                season_rule=season_rule,
-                is_day_fn=is_day_fn,
+                period=period,
+                name=f"Cheapest Tariff {label}",
+                unique_suffix=f"cheapest_tariff_{suffix}",
+                cost_sensors=cost_sensors,
+                current_tariff=current_tariff,
             ),
-            _TariffPeriodCostFromTotalSensor(
+            _TariffSavingsSensor(
                 hass,
                 entry_id=entry.entry_id,
-                total_entity_id=total_energy_entity,
-                period="last_year",
-                name=f"{prefix} - Net Cost Last Year",
-                unique_suffix=f"{prefix.lower()}_net_cost_last_year",
-                day_rate=day_rate,
-                night_rate=night_rate,
-                time_ranges_attr=cfg,
-                season_rule=season_rule,
-                is_day_fn=is_day_fn,
+                period=period,
+                name=f"Savings vs Current Tariff {label}",
+                unique_suffix=f"savings_vs_current_tariff_{suffix}",
+                cost_sensors=cost_sensors,
+                current_tariff=current_tariff,
             ),
-        )
-
-    g12_week, g12_month, g12_year, g12_last_year = _mk_periods(
-        "G12",
-        g12_day_rate,
-        g12_night_rate,
-        g12_cfg,
-        "summer if DST else winter",
-        lambda dt: _is_day_tariff_g12(dt, g12_cfg),
-    )
-    g12w_week, g12w_month, g12w_year, g12w_last_year = _mk_periods(
-        "G12w",
-        g12w_day_rate,
-        g12w_night_rate,
-        g12w_cfg,
-        "summer if DST else winter",
-        lambda dt: _is_day_tariff_g12w(dt, g12w_cfg),
-    )
-    g12n_week, g12n_month, g12n_year, g12n_last_year = _mk_periods(
-        "G12n",
-        g12n_day_rate,
-        g12n_night_rate,
-        g12n_cfg,
-        "fixed (weekday rules; no DST)",
-        lambda dt: _is_day_tariff_g12n(dt, g12n_cfg),
-    )
+        ]
+        needs.extend((c, frozenset({period}), frozenset(cost_sensors)) for c in comparisons[period])
 
     # Config sensors
     sensors: list[SensorEntity] = [
-        G11PricePlnPerKwhSensor(hass, price_entity),
-        g11_today,
-        g12_today,
-        g12w_today,
-        g12n_today,
-        g11_week, g11_month, g11_year, g11_last_year,
-        g12_week, g12_month, g12_year, g12_last_year,
-        g12w_week, g12w_month, g12w_year, g12w_last_year,
-        g12n_week, g12n_month, g12n_year, g12n_last_year,
-        _RateConfigSensor(entry, unique_suffix="g11_rate", name="G11 rate (PLN/kWh)", key=CONF_G11_RATE, default=DEFAULT_G11_RATE),
-        _RateConfigSensor(entry, unique_suffix="g12_day_rate", name="G12 day rate (PLN/kWh)", key=CONF_G12_DAY_RATE, default=DEFAULT_G12_DAY_RATE),
-        _RateConfigSensor(entry, unique_suffix="g12_night_rate", name="G12 night rate (PLN/kWh)", key=CONF_G12_NIGHT_RATE, default=DEFAULT_G12_NIGHT_RATE),
-        _RateConfigSensor(entry, unique_suffix="g12w_day_rate", name="G12w day rate (PLN/kWh)", key=CONF_G12W_DAY_RATE, default=DEFAULT_G12W_DAY_RATE),
-        _RateConfigSensor(entry, unique_suffix="g12w_night_rate", name="G12w night rate (PLN/kWh)", key=CONF_G12W_NIGHT_RATE, default=DEFAULT_G12W_NIGHT_RATE),
-        _RateConfigSensor(entry, unique_suffix="g12n_day_rate", name="G12n day rate (PLN/kWh)", key=CONF_G12N_DAY_RATE, default=DEFAULT_G12N_DAY_RATE),
-        _RateConfigSensor(entry, unique_suffix="g12n_night_rate", name="G12n night rate (PLN/kWh)", key=CONF_G12N_NIGHT_RATE, default=DEFAULT_G12N_NIGHT_RATE),
-        G12ScheduleSummarySensor(entry),
-        G12wScheduleSummarySensor(entry),
-        G12nScheduleSummarySensor(entry),
+        G11PricePlnPerKwhSensor(hass, price_entity, entry_id=entry.entry_id),
+        *(c for group in comparisons.values() for c in group),
     ]
+    # Compact mode leaves out the per-tariff sensors and the config echoes.
+    if not compact:
+        sensors = [
+            sensors[0],
+            *(s for group in cost_sensors_by_period.values() for s in group.values()),
+            *zone_energy,
+            *projections,
+            *sensors[1:],
+            _RateConfigSensor(entry, unique_suffix="g11_rate", name="G11 rate (PLN/kWh)", key=CONF_G11_RATE, default=DEFAULT_G11_RATE),
+            _RateConfigSensor(entry, unique_suffix="g12_day_rate", name="G12 day rate (PLN/kWh)", key=CONF_G12_DAY_RATE, default=DEFAULT_G12_DAY_RATE),
+            _RateConfigSensor(entry, unique_suffix="g12_night_rate", name="G12 night rate (PLN/kWh)", key=CONF_G12_NIGHT_RATE, default=DEFAULT_G12_NIGHT_RATE),
+            _RateConfigSensor(entry, unique_suffix="g12w_day_rate", name="G12w day rate (PLN/kWh)", key=CONF_G12W_DAY_RATE, default=DEFAULT_G12W_DAY_RATE),
+            _RateConfigSensor(entry, unique_suffix="g12w_night_rate", name="G12w night rate (PLN/kWh)", key=CONF_G12W_NIGHT_RATE, default=DEFAULT_G12W_NIGHT_RATE),
+            _RateConfigSensor(entry, unique_suffix="g12n_day_rate", name="G12n day rate (PLN/kWh)", key=CONF_G12N_DAY_RATE, default=DEFAULT_G12N_DAY_RATE),
+            _RateConfigSensor(entry, unique_suffix="g12n_night_rate", name="G12n night rate (PLN/kWh)", key=CONF_G12N_NIGHT_RATE, default=DEFAULT_G12N_NIGHT_RATE),
+            G12ScheduleSummarySensor(entry),
+            G12wScheduleSummarySensor(entry),
+            G12nScheduleSummarySensor(entry),
+            _RateConfigSensor(entry, unique_suffix="g13_morning_peak_rate", name="G13 morning peak rate (PLN/kWh)", key=CONF_G13_MORNING_PEAK_RATE, default=DEFAULT_G13_MORNING_PEAK_RATE),
+            _RateConfigSensor(entry, unique_suffix="g13_afternoon_peak_rate", name="G13 afternoon peak rate (PLN/kWh)", key=CONF_G13_AFTERNOON_PEAK_RATE, default=DEFAULT_G13_AFTERNOON_PEAK_RATE),
+            _RateConfigSensor(entry, unique_suffix="g13_off_peak_rate", name="G13 off-peak rate (PLN/kWh)", key=CONF_G13_OFF_PEAK_RATE, default=DEFAULT_G13_OFF_PEAK_RATE),
+            G13ScheduleSummarySensor(entry),
+        ]
+
+    # The refresh plan follows the entity registry: disabled sensors add no windows to fetch
+    # and no tariffs to evaluate.
+    registry = er.async_get(hass)
+    plan: dict[str, Any] = {"periods": frozenset(), "tariffs": frozenset(), "enabled": set()}
+
+    def _enabled(s: SensorEntity) -> bool:
+        entity_id = registry.async_get_entity_id("sensor", DOMAIN, s.unique_id)
+        reg_entry = registry.async_get(entity_id) if entity_id is not None else None
+        # Not registered yet: it is about to be added, enabled by default.
+        return reg_entry is None or reg_entry.disabled_by is None
 
+    @callback
+    def _build_plan() -> bool:
+        """Rebuild the plan; True when it needs windows or tariffs it did not have before."""
+        enabled = {s for s, _, _ in needs if _enabled(s)}
+        periods = frozenset(p for s, s_periods, _ in needs if s in enabled for p in s_periods)
+        tariffs = frozenset(k for s, _, s_tariffs in needs if s in enabled for k in s_tariffs)
+        grown = not (periods <= plan["periods"] and tariffs <= plan["tariffs"])
+        if tariffs != plan["tariffs"]:
+            evaluator.tariffs = [t for t in compiled if t.key in tariffs]
+            for w in windows.values():
+                w.invalidate()
+        plan.update(periods=periods, tariffs=tariffs, enabled=enabled)
+        hass.data[DOMAIN][entry.entry_id]["plan"] = {
+            "periods": [p for p in windows if p in periods],
+            "tariffs": [t.key for t in evaluator.tariffs],
+            "disabled_entities": len(needs) - len(enabled),
+        }
+        return grown
+
+    _build_plan()
+
+    # Windows are filled before the entities are added, so update_before_add only renders.
+    # A window that fails is logged and left empty; its sensors report no value until it refreshes.
+    await _gather_windows("refresh", {p: w.async_refresh() for p, w in windows.items() if p in plan["periods"]})
+    if compact:
+        # The summaries read cost sensors that are never added, so render those first.
+        for period in plan["periods"]:
+            for s in cost_sensors_by_period[period].values():
+                await s.async_update()
     async_add_entities(sensors, update_before_add=True)
 
+    def _render_list(period: str) -> list[_RenderedSensor]:
+        # Comparisons read the cost sensors' values, so they render after them; a disabled
+        # cost sensor is still rendered (not written) while a comparison needs it.
+        enabled = plan["enabled"]
+        compare = [c for c in comparisons[period] if c in enabled]
+        batch: list[_RenderedSensor] = [
+            s for s in cost_sensors_by_period[period].values() if compare or s in enabled
+        ]
+        batch.extend(compare)
+        if period == "today":
+            batch.extend(s for s in zone_energy if s in enabled)
+        return batch
+
+    async def _refresh(periods: tuple[str, ...]) -> None:
+        """One refresh cycle: recompute the windows, render, then write what changed in one batch."""
+        periods = tuple(p for p in periods if p in plan["periods"])
+        refreshed = await _gather_windows("refresh", {p: windows[p].async_refresh() for p in periods})
+        batch: list[_RenderedSensor] = []
+        for period, changed in refreshed.items():
+            if changed:
+                batch.extend(_render_list(period))
+        if "today" in periods:
+            # Projections read today's partial buckets, so they run after the today window.
+            now_local = dt_util.now()
+            rollup.prune(
+                min(
+                    now_local.date().replace(month=1, day=1),
+                    now_local.date() - timedelta(days=7 * (PROJECTION_PROFILE_WEEKS + 1)),
+                )
+            )
+            batch.extend(s for s in projections if s in plan["enabled"])
+
+        await _write(batch)
+
+    async def _write_today() -> None:
+        # Projections only read the rollup, which the live reading has just updated.
+        await _write([*_render_list("today"), *(s for s in projections if s in plan["enabled"])])
+
+    async def _write(batch: list[_RenderedSensor]) -> None:
+        for s in batch:
+            await s.async_update()
+        written = 0
+        for s in batch:
+            # An entity enabled in the registry is only added when the entry reloads; until
+            # then it has no entity_id to write to.
+            if s.entity_id is not None and s in plan["enabled"] and s.async_write_if_changed():
+                written += 1
+        stats["state_writes"] = stats.get("state_writes", 0) + written
+        stats["state_writes_skipped"] = stats.get("state_writes_skipped", 0) + len(batch) - written
+
     @callback
     def _handle_source_change(event: Any) -> None:
         entity_id = event.data.get("entity_id")
 
-        for s in sensors:
-            if s.hass is None:
-                continue
+        if entity_id == total_energy_entity and "today" in plan["periods"]:
+            # Readings chain onto the today window in memory; anything that does not
+            # (startup, a new day, a gap) reconciles against the recorder instead.
+            if windows["today"].async_apply_state_change(event.data.get("old_state"), event.data.get("new_state")):
+                hass.async_create_task(_write_today())
+            else:
+                hass.async_create_task(_refresh(("today",)))
 
-            if isinstance(s, (G11CostTodayFromTotalSensor, _TariffCostTodayFromTotalSensor)) and entity_id == total_energy_entity:
-                hass.async_create_task(s.async_update_ha_state(True))
+        for s in sensors:
+            if s.entity_id is None:
                 continue
 
             if isinstance(s, G11PricePlnPerKwhSensor) and entity_id == price_entity:
                 hass.async_create_task(s.async_update_ha_state(True))
                 continue
 
-    async_track_state_change_event(hass, [price_entity, total_energy_entity], _handle_source_change)
+    entry.async_on_unload(
+        async_track_state_change_event(hass, [price_entity, total_energy_entity], _handle_source_change)
+    )
+
+    @callback
+    def _is_own_enable_change(event_data: dict[str, Any]) -> bool:
+        if event_data.get("action") != "update" or "disabled_by" not in event_data.get("changes", {}):
+            return False
+        reg_entry = registry.async_get(event_data["entity_id"])
+        return reg_entry is not None and reg_entry.config_entry_id == entry.entry_id
 
-    async def _tick_today(_now: datetime) -> None:
-        for s in (g11_today, g12_today, g12w_today, g12n_today):
-            if s.hass is None:
-                continue
-            hass.async_create_task(s.async_update_ha_state(True))
+    @callback
+    def _handle_registry_update(_event: Any) -> None:
+        # Trimming takes effect on the next refresh; new needs are fetched right away.
+        if _build_plan():
+            hass.async_create_task(_refresh(tuple(windows)))
+
+    entry.async_on_unload(
+        hass.bus.async_listen(
+            er.EVENT_ENTITY_REGISTRY_UPDATED, _handle_registry_update, event_filter=_is_own_enable_change
+        )
+    )
 
-    async_track_time_interval(hass, _tick_today, timedelta(minutes=2))
+    # Event-driven scheduling: wake at the next tariff switch or period rollover
+    # (whichever is first), falling back to a long idle interval in between. The windows
+    # that roll over are refreshed once more shortly before their boundary.
+    tariff_boundaries = compile_tariff_boundaries(compiled)
+    idle = timedelta(minutes=IDLE_REFRESH_INTERVAL_MINUTES)
+    scheduled: dict[str, Any] = {"unsub": None, "kind": None, "periods": (), "when": None}
 
-    async def _tick_periods(_now: datetime) -> None:
-        for s in (
-            g11_week, g11_month, g11_year, g11_last_year,
-            g12_week, g12_month, g12_year, g12_last_year,
-            g12w_week, g12w_month, g12w_year, g12w_last_year,
-            g12n_week, g12n_month, g12n_year, g12n_last_year,
-        ):
-            if s.hass is None:
+    @callback
+    def _schedule_next() -> None:
+        now_local = dt_util.now()
+        candidates = [(now_local + idle, "idle", ())]
+        next_tariff = next_tariff_boundary_local(now_local, tariff_boundaries)
+        if next_tariff is not None:
+            candidates.append((next_tariff, "tariff", ()))
+        starts = {period: next_period_start_local(now_local, period) for period in ("today", "week", "month", "year")}
+        rollover = min(starts.values())
+        rolling = tuple(period for period, start in starts.items() if start == rollover)
+        candidates.append((rollover, "period", rolling))
+        prewarm = rollover - timedelta(seconds=ROLLOVER_PREWARM_SECONDS)
+        if prewarm > now_local:
+            candidates.append((prewarm, "prewarm", rolling))
+        # On ties the period rollover wins, since it implies a full refresh.
+        when, kind, periods = min(candidates, key=lambda c: (c[0], c[1] != "period"))
+        scheduled.update(kind=kind, periods=periods, when=when)
+        scheduled["unsub"] = async_track_point_in_utc_time(hass, _on_boundary, dt_util.as_utc(when))
+
+    async def _rollover(boundary: datetime, rolling: tuple[str, ...]) -> None:
+        """Close the windows that end at `boundary`, hand them over, then refresh everything."""
+        closing = [p for p in rolling if p in plan["periods"] and windows[p].result is not None]
+        closed = await _gather_windows("close", {p: windows[p].async_close(boundary) for p in closing})
+        for period, result in closed.items():
+            if result is None:
                 continue
-            hass.async_create_task(s.async_update_ha_state(True))
+            days.absorb(windows[period].start_local, boundary, result)
+            # The final This Year becomes Last Year as is; nothing is recomputed for it.
+            promote = period == "year" and "last_year" in plan["periods"]
+            if promote and windows["year"].start_local.year == boundary.year - 1:
+                windows["last_year"].adopt(windows["year"], result)
+        await _refresh(tuple(windows))
+
+    async def _on_boundary(_now: datetime) -> None:
+        kind = scheduled["kind"]
+        if kind == "tariff":
+            hass.async_create_task(_refresh(("today",)))
+        elif kind == "prewarm":
+            # Fresh results just before the rollover leave only minutes to catch up on.
+            hass.async_create_task(_refresh(scheduled["periods"]))
+        elif kind == "period":
+            hass.async_create_task(_rollover(scheduled["when"], scheduled["periods"]))
+        else:
+            hass.async_create_task(_refresh(tuple(windows)))
+        _schedule_next()
+
+    @callback
+    def _cancel_schedule() -> None:
+        if scheduled["unsub"] is not None:
+            scheduled["unsub"]()
+            scheduled["unsub"] = None
 
-    async_track_time_interval(hass, _tick_periods, timedelta(minutes=15))
+    _schedule_next()
+    entry.async_on_unload(_cancel_schedule)
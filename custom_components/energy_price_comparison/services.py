@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import os
+from datetime import date, datetime, timedelta
+
+import voluptuous as vol
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DATA_SERIES_CACHE,
+    DOMAIN,
+    PERIODS,
+    SERVICE_EXPORT_HOURLY,
+    SERVICE_LOAD_PROFILE,
+    SERVICE_RANGE_COST,
+    SERVICE_SHIFT_SAVINGS,
+)
+
+EXPORT_SCHEMA = vol.Schema(
+    {
+        vol.Required("start"): cv.date,
+        vol.Required("end"): cv.date,
+        vol.Optional("filename"): cv.string,
+        vol.Optional("format", default="csv"): vol.In(["csv", "parquet"]),
+        vol.Optional("config_entry_id"): cv.string,
+    }
+)
+
+LOAD_PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional("period", default="month"): vol.In(PERIODS),
+        vol.Optional("config_entry_id"): cv.string,
+    }
+)
+
+SHIFT_SAVINGS_SCHEMA = vol.Schema(
+    {
+        vol.Required("kwh"): vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional("tariff", default="G12"): cv.string,
+        vol.Optional("from_zone", default="day"): cv.string,
+        vol.Optional("to_zone", default="night"): cv.string,
+        vol.Optional("period", default="month"): vol.In(PERIODS),
+        vol.Optional("config_entry_id"): cv.string,
+    }
+)
+
+# A date means local midnight; an end date is inclusive. Datetimes are used as given
+# (naive ones in the configured time zone) with an exclusive end.
+RANGE_COST_SCHEMA = vol.Schema(
+    {
+        vol.Required("start"): vol.Any(cv.date, cv.datetime),
+        vol.Required("end"): vol.Any(cv.date, cv.datetime),
+        vol.Optional("config_entry_id"): cv.string,
+    }
+)
+
+
+def _range_bound(value: date | datetime, *, end: bool) -> datetime:
+    if isinstance(value, datetime):
+        return dt_util.as_local(value) if value.tzinfo else value.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+    if end:
+        value += timedelta(days=1)
+    return datetime.combine(value, datetime.min.time(), tzinfo=dt_util.DEFAULT_TIME_ZONE)
+
+
+def _runtime_for_call(hass: HomeAssistant, call: ServiceCall) -> dict:
+    runtimes = {
+        key: runtime for key, runtime in hass.data.get(DOMAIN, {}).items() if key != DATA_SERIES_CACHE
+    }
+    entry_id = call.data.get("config_entry_id")
+    if entry_id is not None:
+        runtime = runtimes.get(entry_id)
+    elif len(runtimes) > 1:
+        # With several meters or offers loaded, guessing could answer for the wrong one.
+        raise ServiceValidationError(
+            "Several Energy Price Comparison entries are loaded; set config_entry_id"
+        )
+    else:
+        runtime = next(iter(runtimes.values()), None)
+    if not runtime:
+        raise HomeAssistantError("No loaded Energy Price Comparison entry found")
+    return runtime
+
+
+async def async_setup_services(hass: HomeAssistant) -> None:
+    if hass.services.has_service(DOMAIN, SERVICE_EXPORT_HOURLY):
+        return
+
+    async def _export_hourly(call: ServiceCall) -> ServiceResponse:
+        # Imported on first use; the export pipeline is not needed at setup.
+        from homeassistant.components.recorder import get_instance
+
+        from .export import export_hourly_breakdown
+
+        runtime = _runtime_for_call(hass, call)
+        start = call.data["start"]
+        end = call.data["end"]
+        if end < start:
+            raise HomeAssistantError("end must not be before start")
+        fmt = call.data["format"]
+
+        filename = call.data.get("filename") or f"hourly_{start.isoformat()}_{end.isoformat()}.{fmt}"
+        if os.path.basename(filename) != filename:
+            raise HomeAssistantError("filename must not contain a directory")
+        path = hass.config.path(DOMAIN, filename)
+
+        tz = dt_util.DEFAULT_TIME_ZONE
+        start_utc = dt_util.as_utc(datetime.combine(start, datetime.min.time(), tzinfo=tz))
+        end_utc = dt_util.as_utc(datetime.combine(end + timedelta(days=1), datetime.min.time(), tzinfo=tz))
+
+        rows = await get_instance(hass).async_add_executor_job(
+            lambda: export_hourly_breakdown(
+                hass,
+                statistic_id=runtime["total_energy_entity"],
+                tariffs=runtime["tariffs"],
+                start_utc=start_utc,
+                end_utc=end_utc,
+                tz=tz,
+                path=path,
+                fmt=fmt,
+            )
+        )
+        return {"path": path, "rows": rows, "format": fmt}
+
+    async def _load_profile(call: ServiceCall) -> ServiceResponse:
+        runtime = _runtime_for_call(hass, call)
+        window = runtime["windows"][call.data["period"]]
+        return {
+            "period": window.period,
+            "start_local": window.start_local.isoformat(),
+            **window.profile.as_dict(),
+        }
+
+    async def _shift_savings(call: ServiceCall) -> ServiceResponse:
+        runtime = _runtime_for_call(hass, call)
+        tariffs = {t.key: t for t in runtime["tariffs"]}
+        tariff = tariffs.get(call.data["tariff"])
+        if tariff is None:
+            raise HomeAssistantError(f"Unknown tariff; expected one of {', '.join(tariffs)}")
+        from_zone = call.data["from_zone"]
+        to_zone = call.data["to_zone"]
+        if from_zone not in tariff.zones or to_zone not in tariff.zones:
+            raise HomeAssistantError(f"{tariff.key} zones are {', '.join(tariff.zones)}")
+
+        window = runtime["windows"][call.data["period"]]
+        if tariff.key not in window.profile.zone_kwh:
+            raise HomeAssistantError(f"{tariff.key} is not evaluated; all of its sensors are disabled")
+        result = window.profile.shift_savings(
+            tariff.key, call.data["kwh"], from_zone, to_zone, on=window.last_day
+        )
+        return {
+            "period": window.period,
+            "tariff": tariff.key,
+            "from_zone": from_zone,
+            "to_zone": to_zone,
+            "requested_kwh": call.data["kwh"],
+            "shiftable_kwh": round(result["shiftable_kwh"], 4),
+            "savings_pln": round(result["savings_pln"], 4),
+            "from_rate_pln_per_kwh": result["from_rate"],
+            "to_rate_pln_per_kwh": result["to_rate"],
+        }
+
+    async def _range_cost(call: ServiceCall) -> ServiceResponse:
+        runtime = _runtime_for_call(hass, call)
+        start = _range_bound(call.data["start"], end=False)
+        end = _range_bound(call.data["end"], end=True)
+        if end <= start:
+            raise HomeAssistantError("end must be after start")
+        if start >= dt_util.now():
+            raise HomeAssistantError("start must be in the past")
+        return await runtime["days"].async_query(start, end)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_LOAD_PROFILE,
+        _load_profile,
+        schema=LOAD_PROFILE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SHIFT_SAVINGS,
+        _shift_savings,
+        schema=SHIFT_SAVINGS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RANGE_COST,
+        _range_cost,
+        schema=RANGE_COST_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_HOURLY,
+        _export_hourly,
+        schema=EXPORT_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
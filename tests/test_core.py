@@ -0,0 +1,37 @@
+"""Tests for the Home Assistant-free tariff engine in .core."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from custom_components.energy_price_comparison.core import fill_gaps, find_gaps
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _at(hours: float) -> datetime:
+    return START + timedelta(hours=hours)
+
+
+def test_leading_gap_ending_on_the_hour_keeps_every_hour():
+    # History purged up to 05:00 sharp; the statistics sum grows by 1 kWh every hour.
+    raw = [(_at(5), 105.0), (_at(6), 106.0)]
+    hourly = [(_at(h), 1000.0 + h) for h in range(0, 7)]
+    gaps = find_gaps(raw, START, _at(6), timedelta(hours=2))
+    assert gaps == [(START, _at(5))]
+
+    merged, filled = fill_gaps(raw, gaps, hourly)
+
+    assert merged[0] == (START, 100.0)
+    assert merged[-1][1] - merged[0][1] == 6.0
+    assert filled == timedelta(hours=5)
+
+
+def test_flat_gap_is_not_filled():
+    raw = [(_at(0), 10.0), (_at(4), 10.0)]
+    hourly = [(_at(h), 500.0) for h in range(0, 5)]
+    gaps = find_gaps(raw, START, _at(4), timedelta(hours=2))
+
+    merged, filled = fill_gaps(raw, gaps, hourly)
+
+    assert merged == raw
+    assert filled == timedelta(0)